@@ -0,0 +1,58 @@
+"""
+Download time with and without compressed transfer, against the local mock
+server at several simulated bandwidths (bytes per second per response;
+0 for unlimited).
+
+Compression pays off once the link, not the CPU, is the bottleneck.
+
+    python -m benchmarks.bench_compress --rows 100000 \\
+        --bandwidth 1e6 1e7 1e8 0
+"""
+import argparse
+import time
+
+from splunk_connector.core import SplunkConnect
+from splunk_connector.mock import MockSplunk, make_data
+
+
+def run(conn, method, chunksize):
+    t0 = time.perf_counter()
+    if method == 'read_pandas':
+        rows = len(conn.read_pandas('*', parallel=4))
+    else:
+        rows = sum(len(df) for df in getattr(conn, method)('*', chunksize))
+    return rows, time.perf_counter() - t0
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawTextHelpFormatter)
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--cols', type=int, default=4)
+    parser.add_argument('--chunksize', type=int, default=10000)
+    parser.add_argument('--bandwidth', type=float, nargs='+',
+                        default=[1e6, 1e7, 1e8, 0])
+    parser.add_argument('--methods', nargs='+',
+                        default=['read_pandas', 'read_pandas_stream'],
+                        choices=['read_pandas', 'read_pandas_iter',
+                                 'read_pandas_stream', 'read_pandas_export'])
+    args = parser.parse_args()
+    data = make_data(args.rows, args.cols)
+    print('%-18s %10s %8s %9s %10s %12s' % (
+        'method', 'bandwidth', 'compress', 'time (s)', 'MB sent', 'rows/s'))
+    for bandwidth in args.bandwidth:
+        with MockSplunk(data, bandwidth=bandwidth or None) as server:
+            for method in args.methods:
+                for compress in [False, True]:
+                    conn = SplunkConnect(server.url, key='bench',
+                                         compress=compress)
+                    sent = server.stats['bytes_sent']
+                    rows, elapsed = run(conn, method, args.chunksize)
+                    print('%-18s %10.0g %8s %9.3f %10.2f %12.0f' % (
+                        method, bandwidth, compress, elapsed,
+                        (server.stats['bytes_sent'] - sent) / 2**20,
+                        rows / elapsed))
+
+
+if __name__ == '__main__':
+    main()
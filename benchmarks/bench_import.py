@@ -0,0 +1,61 @@
+"""
+Time to import the connector in a fresh interpreter, against a target.
+
+Heavy dependencies (pandas, numpy, requests, dask, pyarrow) must not load
+at import time; short-lived scripts that only list saved searches or
+check a job should not pay for them. Exits non-zero if the median time
+exceeds the target or if any of them is loaded.
+
+    python -m benchmarks.bench_import --target 50 --repeat 10
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+HEAVY = ['pandas', 'numpy', 'requests', 'urllib3', 'dask', 'pyarrow',
+         'aiohttp']
+
+SCRIPT = """
+import json, sys, time
+t0 = time.perf_counter()
+import %s
+t = time.perf_counter() - t0
+print(json.dumps({'ms': t * 1000,
+                  'heavy': [m for m in %r if m in sys.modules]}))
+"""
+
+
+def measure(module):
+    out = subprocess.run([sys.executable, '-c', SCRIPT % (module, HEAVY)],
+                         check=True, capture_output=True, text=True).stdout
+    return json.loads(out)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawTextHelpFormatter)
+    parser.add_argument('--target', type=float, default=50,
+                        help='most milliseconds allowed for the median')
+    parser.add_argument('--repeat', type=int, default=10)
+    parser.add_argument('--modules', nargs='+',
+                        default=['splunk_connector', 'splunk_connector.core'])
+    args = parser.parse_args()
+    ok = True
+    print('%-24s %9s %9s  %s' % ('module', 'median ms', 'max ms', 'heavy'))
+    for module in args.modules:
+        runs = [measure(module) for _ in range(args.repeat)]
+        times = [r['ms'] for r in runs]
+        heavy = sorted({m for r in runs for m in r['heavy']})
+        median = statistics.median(times)
+        print('%-24s %9.1f %9.1f  %s' % (module, median, max(times),
+                                         ', '.join(heavy) or '-'))
+        ok = ok and median <= args.target and not heavy
+    if not ok:
+        print('FAIL: over %g ms or heavy modules loaded' % args.target)
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
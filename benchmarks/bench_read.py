@@ -0,0 +1,95 @@
+"""
+Throughput and latency of the read paths against the local mock server.
+
+Each case runs in a fresh process, so that peak RSS belongs to that case
+alone. Reports rows/s, MB/s (as sent by the server), peak RSS and
+time-to-first-row (for read_pandas and read_dask, the first row is only
+available once the whole result is).
+
+    python -m benchmarks.bench_read --rows 1000 100000 1000000 \\
+        --chunksize 10000 100000 --cols 4 40 --latency 0 0.01
+"""
+import argparse
+import itertools
+import multiprocessing
+import resource
+import time
+
+from splunk_connector.mock import MockSplunk, make_data
+
+METHODS = ['read_pandas', 'read_pandas_iter', 'read_pandas_stream',
+           'read_pandas_export', 'read_dask']
+
+
+def measure(url, method, chunksize, parallel, out):
+    from splunk_connector.core import SplunkConnect
+    conn = SplunkConnect(url, key='bench')
+    t0 = time.perf_counter()
+    first = None
+    rows = 0
+    if method == 'read_pandas':
+        rows = len(conn.read_pandas('*', parallel=parallel,
+                                    chunksize=chunksize))
+    elif method in ('read_pandas_iter', 'read_pandas_stream',
+                    'read_pandas_export'):
+        for df in getattr(conn, method)('*', chunksize):
+            if first is None:
+                first = time.perf_counter() - t0
+            rows += len(df)
+    elif method == 'read_dask':
+        rows = len(conn.read_dask('*', chunksize).compute(scheduler='threads'))
+    elapsed = time.perf_counter() - t0
+    out.put({'elapsed': elapsed, 'first': elapsed if first is None else first,
+             'rows': rows,
+             'rss': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024})
+
+
+def run_case(server, method, chunksize, parallel):
+    ctx = multiprocessing.get_context('spawn')
+    out = ctx.Queue()
+    sent = server.stats['bytes_sent']
+    proc = ctx.Process(target=measure, args=(server.url, method, chunksize,
+                                             parallel, out))
+    proc.start()
+    res = out.get()
+    proc.join()
+    res['bytes'] = server.stats['bytes_sent'] - sent
+    return res
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawTextHelpFormatter)
+    parser.add_argument('--rows', type=int, nargs='+',
+                        default=[1000, 100000, 1000000])
+    parser.add_argument('--chunksize', type=int, nargs='+', default=[100000])
+    parser.add_argument('--cols', type=int, nargs='+', default=[4])
+    parser.add_argument('--latency', type=float, nargs='+', default=[0])
+    parser.add_argument('--run-time', type=float, default=0,
+                        help='seconds each mock search job takes')
+    parser.add_argument('--parallel', type=int, default=None,
+                        help='threads for read_pandas; default one request')
+    parser.add_argument('--methods', nargs='+', default=METHODS,
+                        choices=METHODS)
+    args = parser.parse_args()
+    print('%-18s %9s %7s %5s %7s %12s %8s %9s %10s' % (
+        'method', 'rows', 'chunk', 'cols', 'latency', 'rows/s', 'MB/s',
+        'RSS (MB)', 'first (s)'))
+    for nrows, ncols in itertools.product(args.rows, args.cols):
+        data = make_data(nrows, ncols)
+        for latency in args.latency:
+            with MockSplunk(data, latency=latency,
+                            run_time=args.run_time) as server:
+                for method, chunksize in itertools.product(args.methods,
+                                                           args.chunksize):
+                    res = run_case(server, method, chunksize,
+                                   args.parallel)
+                    print('%-18s %9i %7i %5i %7.3f %12.0f %8.1f %9.0f %10.3f'
+                          % (method, nrows, chunksize, ncols, latency,
+                             res['rows'] / res['elapsed'],
+                             res['bytes'] / res['elapsed'] / 2**20,
+                             res['rss'], res['first']))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,43 @@
+"""
+Per-chunk latency of pooled (keep-alive) versus one-connection-per-request
+sessions, against the local mock server.
+
+    python -m benchmarks.bench_session --rows 100000 --chunksize 1000
+"""
+import argparse
+import time
+
+from splunk_connector.core import SplunkConnect
+from splunk_connector.mock import MockSplunk, make_data
+
+
+def run(conn, method, chunksize):
+    t0 = time.perf_counter()
+    if method == 'read_pandas_iter':
+        n = sum(1 for _ in conn.read_pandas_iter('*', chunksize))
+    else:
+        df = conn.read_dask('*', chunksize)
+        n = df.npartitions
+        df.compute(scheduler='threads')
+    return (time.perf_counter() - t0) / n
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--chunksize', type=int, default=1000)
+    args = parser.parse_args()
+    with MockSplunk(make_data(args.rows)) as server:
+        for method in ['read_pandas_iter', 'read_dask']:
+            for keep_alive in [False, True]:
+                conn = SplunkConnect(server.url, key='bench',
+                                     keep_alive=keep_alive)
+                before = server.stats['connections']
+                per_chunk = run(conn, method, args.chunksize)
+                print('%-16s keep_alive=%-5s %8.3f ms/chunk %6i connections'
+                      % (method, keep_alive, per_chunk * 1000,
+                         server.stats['connections'] - before))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,284 @@
+"""
+asyncio counterpart of ``SplunkConnect``, built on aiohttp
+
+Many jobs can be dispatched, polled and downloaded concurrently from one
+event loop, without a thread per job.
+"""
+import asyncio
+import io
+import time
+
+from .core import SplunkConnect, _fields_param
+
+
+class AsyncSplunkConnect:
+
+    """
+    Talk to Splunk over REST from asyncio, download data to dataframes
+
+    Must be used within a running event loop; call ``await .close()`` when
+    done, or use as ``async with AsyncSplunkConnect(...) as conn:``.
+
+    Main user methods: read_pandas, read_pandas_iter (an async iterator)
+
+    Parameters
+    ----------
+    base_url: str
+        Address to contact Splunk on, e.g., ``https://localhost:8089``
+    key: str
+        Auth key, if known
+    limit: int
+        Maximum number of connections open at once, across all jobs
+    limit_per_host: int
+        Maximum number of connections to any one host (0 for no limit)
+    keep_alive: bool
+        If False, close each connection after every request
+    compress: bool
+        Ask for gzip/deflate compressed responses, as for ``SplunkConnect``
+    retries: int
+        Times to retry a request that fails transiently, as for
+        ``SplunkConnect``
+    """
+
+    POLL_TIME = SplunkConnect.POLL_TIME
+    POLL_MIN = SplunkConnect.POLL_MIN
+    POLL_BACKOFF = SplunkConnect.POLL_BACKOFF
+    TIMEOUT = SplunkConnect.TIMEOUT
+    POLL_STATS_MAX = SplunkConnect.POLL_STATS_MAX
+    RETRY_WAIT = SplunkConnect.RETRY_WAIT
+    RETRY_MAX_WAIT = SplunkConnect.RETRY_MAX_WAIT
+    RETRY_STATUS = SplunkConnect.RETRY_STATUS
+    REFUSED_STATUS = SplunkConnect.REFUSED_STATUS
+
+    def __init__(self, base_url, key=None, limit=100, limit_per_host=0,
+                 keep_alive=True, compress=True, retries=3):
+        self.url = base_url
+        self.key = key
+        self.head = {}
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.keep_alive = keep_alive
+        self.compress = compress
+        self.retries = retries
+        self.poll_stats = {}
+        self._session = None
+        if key:
+            self.auth_head(key)
+
+    auth_head = SplunkConnect.auth_head
+    _sanitize_query = staticmethod(SplunkConnect._sanitize_query)
+    _filter_query = staticmethod(SplunkConnect._filter_query)
+    _scheduler = SplunkConnect._scheduler
+    _record_poll = SplunkConnect._record_poll
+    _retry_wait = SplunkConnect._retry_wait
+
+    @property
+    def session(self):
+        if self._session is None:
+            import aiohttp
+            connector = aiohttp.TCPConnector(
+                limit=self.limit, limit_per_host=self.limit_per_host,
+                ssl=False, force_close=not self.keep_alive)
+            self._session = aiohttp.ClientSession(
+                connector=connector, headers={
+                    'Accept-Encoding': ('gzip, deflate' if self.compress
+                                        else 'identity')})
+        return self._session
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        await self.close()
+
+    async def _request(self, method, path, json=True, idempotent=None,
+                       **kwargs):
+        """
+        Make a call against the server, returning decoded JSON or bytes
+
+        Transient failures are retried, as by ``SplunkConnect._request``;
+        as there, calls that are not ``idempotent`` (by default, POSTs)
+        only if the server cannot have acted on them.
+        """
+        import aiohttp
+        kwargs.setdefault('headers', self.head)
+        if idempotent is None:
+            idempotent = method != 'POST'
+        retry_status = self.RETRY_STATUS if idempotent else [
+            s for s in self.RETRY_STATUS if s in self.REFUSED_STATUS]
+        for attempt in range(self.retries + 1):
+            last = attempt == self.retries
+            try:
+                async with self.session.request(method, self.url + path,
+                                                **kwargs) as r:
+                    if r.status in retry_status and not last:
+                        wait = self._retry_wait(attempt, r)
+                    else:
+                        r.raise_for_status()
+                        if json:
+                            return await r.json(content_type=None)
+                        return await r.read()
+            except (aiohttp.ClientConnectionError, aiohttp.ClientPayloadError,
+                    asyncio.TimeoutError) as e:
+                if last or not (idempotent or isinstance(
+                        e, aiohttp.ClientConnectorError)):
+                    raise
+                wait = self._retry_wait(attempt)
+            await asyncio.sleep(wait)
+
+    async def auth(self, user, pw):
+        """
+        Login to splunk and get a session key
+        """
+        out = await self._request('POST',
+                                  '/services/auth/login?output_mode=json',
+                                  idempotent=True,
+                                  data={'username': user, 'password': pw})
+        self.key = out['sessionKey']
+        self.auth_head(self.key)
+
+    async def list_saved_searches(self):
+        """
+        Get saved search names/definitions as a dict
+        """
+        out = await self._request(
+            'GET', '/services/saved/searches?output_mode=json')
+        return {o['name']: o['content']['search'] for o in out['entry']}
+
+    async def start_query(self, q):
+        """
+        Initiate a query as a job
+        """
+        q = self._sanitize_query(q)
+        out = await self._request('POST',
+                                  '/services/search/jobs?output_mode=json',
+                                  data={'search': q})
+        return out['sid']
+
+    async def poll_status(self, sid):
+        """
+        Get the full status content of a job
+        """
+        path = '/services/search/jobs/{}?output_mode=json'.format(sid)
+        return (await self._request('GET', path))['entry'][0]['content']
+
+    async def poll_query(self, sid):
+        """
+        Check the status of a job
+        """
+        out = await self.poll_status(sid)
+        return out['isDone'], out.get('resultCount', 0)
+
+    async def wait_poll(self, sid):
+        """
+        Poll until the job is done, returning (done, result count)
+
+        Uses the same adaptive schedule as ``SplunkConnect.wait_poll``.
+        """
+        sched = self._scheduler()
+        while True:
+            status = await self.poll_status(sid)
+            if status['isDone']:
+                self._record_poll(sid, sched.done(status))
+                return True, status.get('resultCount', 0)
+            if time.time() - sched.time0 > self.TIMEOUT:
+                raise RuntimeError("Timeout waiting for Splunk to finish query")
+            await asyncio.sleep(sched.next_wait(status))
+
+    async def get_query_result(self, sid, offset=0, count=0, columns=None):
+        """
+        Fetch query output (as CSV), optionally only the given fields
+        """
+        path = ('/services/search/jobs/{}/results/?output_mode=csv'
+                '&offset={}&count={}').format(
+                    sid, offset, count) + _fields_param(columns)
+        return await self._request('GET', path, json=False)
+
+    async def get_dataframe(self, sid, offset=0, count=0, columns=None,
+                            **kwargs):
+        """
+        Read a chunk from completed query, return a pandas dataframe
+
+        Parsing happens in a worker thread, so as not to block the loop.
+
+        Parameters
+        ----------
+        sid: str
+            The job's ID
+        offset: int
+            Starting row
+        count: int
+            Number of rows to fetch
+        columns: list of str or None
+            Fields to fetch; the server sends only these
+        kwargs: passed to pd.read_csv
+        """
+        import pandas as pd
+        txt = await self.get_query_result(sid, offset, count, columns)
+        return await asyncio.to_thread(pd.read_csv, io.BytesIO(txt), **kwargs)
+
+    async def read_pandas(self, q, parallel=None, chunksize=None, filters=None,
+                          **kwargs):
+        """
+        Start query, wait for completion and download data as a dataframe
+
+        Parameters
+        ----------
+        q: str
+            Valid Splunk query
+        parallel: int or None
+            If given, download this many chunks concurrently and concatenate
+            them in order; otherwise fetch the whole result in one request
+        chunksize: int or None
+            Number of rows in each chunk, when ``parallel`` is set. Default
+            is to split the result evenly.
+        filters: list of tuples or None
+            Row conditions, appended to ``q`` as a ``| where`` clause, as
+            for ``SplunkConnect.read_pandas``
+        kwargs: passed to get_dataframe (e.g., ``columns=``) and from there
+            to pd.read_csv
+        """
+        import pandas as pd
+        sid = await self.start_query(self._filter_query(q, filters))
+        done, count = await self.wait_poll(sid)
+        if not parallel or not count:
+            return await self.get_dataframe(sid, **kwargs)
+        chunksize = chunksize or -(-count // parallel)
+        sem = asyncio.Semaphore(parallel)
+
+        async def part(i):
+            async with sem:
+                return await self.get_dataframe(sid, offset=i, count=chunksize,
+                                                **kwargs)
+
+        parts = await asyncio.gather(*[part(i)
+                                       for i in range(0, count, chunksize)])
+        return pd.concat(parts, ignore_index=True)
+
+    async def read_pandas_iter(self, q, chunksize, filters=None, **kwargs):
+        """
+        Start query, wait for completion and make an async iterator of
+        dataframes
+
+        Parameters
+        ----------
+        q: str
+            Valid Splunk query
+        chunksize: int
+            Number of rows in each dataframe
+        filters: list of tuples or None
+            Row conditions, appended to ``q`` as a ``| where`` clause, as
+            for ``SplunkConnect.read_pandas``
+        kwargs: passed to get_dataframe (e.g., ``columns=``) and from there
+            to pd.read_csv
+        """
+        sid = await self.start_query(self._filter_query(q, filters))
+        done, count = await self.wait_poll(sid)
+        for i in range(0, count, chunksize):
+            yield await self.get_dataframe(sid, offset=i, count=chunksize,
+                                           **kwargs)
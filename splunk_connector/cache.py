@@ -0,0 +1,270 @@
+"""
+Caches that save repeat work: query results on disk, and live search jobs
+"""
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+import uuid
+
+
+class JobRegistry:
+
+    """
+    Map recently dispatched queries to their live job SIDs
+
+    Identical queries (after sanitizing) over the same time range within
+    ``ttl`` seconds share one job, skipping dispatch and, once the job is
+    done, any waiting: a single status request gives the result count.
+    Keep ``ttl`` below the server's job lifetime (``dispatch.ttl``, ten
+    minutes by default), after which the SID is gone.
+
+    Pass an instance as ``SplunkConnect(..., jobs=)``.
+
+    Parameters
+    ----------
+    ttl: float
+        Seconds for which a job is reused after dispatch
+    """
+
+    def __init__(self, ttl=300):
+        self.ttl = ttl
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(q, earliest=None, latest=None):
+        return q, earliest, latest
+
+    def get(self, key):
+        """
+        SID for key, or None if missing or expired
+        """
+        with self._lock:
+            sid, t = self._jobs.get(key, (None, 0))
+            if sid is not None and time.time() - t > self.ttl:
+                del self._jobs[key]
+                return None
+            return sid
+
+    def put(self, key, sid):
+        with self._lock:
+            self._jobs[key] = sid, time.time()
+
+    def __getstate__(self):
+        # locks do not pickle; each process gets its own (empty) registry
+        return {'ttl': self.ttl}
+
+    def __setstate__(self, state):
+        self.__init__(**state)
+
+
+class ResultCache:
+
+    """
+    Store query results on local disk, so that repeat reads need no job
+
+    Each entry is a directory of Parquet parts plus a manifest. Entries
+    older than ``ttl`` are dropped, and when the total size exceeds
+    ``max_bytes`` the least recently read entries are evicted.
+
+    Pass an instance as ``SplunkConnect(..., cache=)``; ``read_pandas`` and
+    ``read_dask`` then consult it before dispatching a job.
+
+    Parameters
+    ----------
+    path: str
+        Directory to store results in; created if necessary
+    ttl: float
+        Seconds for which an entry stays valid
+    max_bytes: int
+        Maximum total size of stored results
+    """
+
+    def __init__(self, path, ttl=3600, max_bytes=2**30):
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        os.makedirs(path, exist_ok=True)
+
+    @staticmethod
+    def key(q, earliest=None, latest=None, **options):
+        """
+        Identify a query, its time range and parse options
+        """
+        txt = repr((q, earliest, latest, sorted(options.items())))
+        return hashlib.sha256(txt.encode()).hexdigest()
+
+    def _dir(self, key):
+        return os.path.join(self.path, key)
+
+    def _manifest(self, key):
+        return os.path.join(self._dir(key), 'manifest.json')
+
+    def part_path(self, key, i):
+        return os.path.join(self._dir(key), 'part.%i.parquet' % i)
+
+    def _read_manifest(self, key):
+        try:
+            with open(self._manifest(key)) as f:
+                return json.load(f)
+        except (IOError, ValueError):
+            return None
+
+    def _expired(self, manifest):
+        return time.time() - manifest['created'] > self.ttl
+
+    def get(self, key):
+        """
+        Paths of the Parquet parts for key, or None if missing or expired
+        """
+        manifest = self._read_manifest(key)
+        if manifest is None:
+            return None
+        if self._expired(manifest):
+            self.remove(key)
+            return None
+        paths = [self.part_path(key, i) for i in range(manifest['nparts'])]
+        if not all(os.path.exists(p) for p in paths):
+            # still being written, e.g., by dask partitions
+            return None
+        # access time of the manifest marks recent use, for LRU
+        os.utime(self._manifest(key))
+        return paths
+
+    def load(self, key, **kwargs):
+        """
+        Read a whole entry as one dataframe, or None if missing or expired
+
+        kwargs are passed to ``pd.read_parquet``
+        """
+        import pandas as pd
+        paths = self.get(key)
+        if paths is None:
+            return None
+        return pd.concat([pd.read_parquet(p, **kwargs) for p in paths],
+                         ignore_index=True)
+
+    def begin(self, key, nparts):
+        """
+        Start a new entry, returning the directory to pass to ``put_part``
+
+        Each writer stages its parts in a directory of its own, which
+        replaces the entry only once all ``nparts`` are written; so readers
+        and other writers of the same key only ever see complete entries.
+        """
+        staging = '%s.%s.tmp' % (self._dir(key), uuid.uuid4().hex)
+        os.makedirs(staging)
+        with open(os.path.join(staging, 'manifest.json'), 'w') as f:
+            json.dump({'created': time.time(), 'nparts': nparts}, f)
+        return staging
+
+    def put_part(self, staging, i, df):
+        """
+        Write one part of an entry started with ``begin``
+
+        Writing the last part stores the entry, then evicts as needed.
+        """
+        if not os.path.isdir(staging):
+            # abandoned long ago and cleared away by ``evict``
+            return
+        path = os.path.join(staging, 'part.%i.parquet' % i)
+        df.to_parquet(path + '.tmp', index=False)
+        os.replace(path + '.tmp', path)
+        if self._complete(staging):
+            self._commit(staging)
+
+    @staticmethod
+    def _complete(d):
+        try:
+            with open(os.path.join(d, 'manifest.json')) as f:
+                nparts = json.load(f)['nparts']
+            names = os.listdir(d)
+        except (IOError, ValueError):
+            return False
+        return sum(n.endswith('.parquet') for n in names) == nparts
+
+    def _commit(self, staging):
+        """
+        Move a complete staging directory into place as its entry
+        """
+        # parts may finish together; only one of them commits
+        claimed = staging[:-len('.tmp')] + '.commit'
+        try:
+            os.rename(staging, claimed)
+        except OSError:
+            return
+        final = os.path.join(self.path, os.path.basename(staging)
+                             .split('.')[0])
+        old = '%s.%s.old' % (final, uuid.uuid4().hex)
+        try:
+            os.rename(final, old)
+        except FileNotFoundError:
+            old = None
+        try:
+            os.rename(claimed, final)
+        except OSError:
+            # another writer of the same key stored it meanwhile
+            shutil.rmtree(claimed, ignore_errors=True)
+        else:
+            os.utime(os.path.join(final, 'manifest.json'))
+        if old is not None:
+            shutil.rmtree(old, ignore_errors=True)
+        self.evict()
+
+    def put(self, key, df):
+        """
+        Store a dataframe as a single-part entry, then evict as needed
+        """
+        self.put_part(self.begin(key, 1), 0, df)
+
+    def remove(self, key):
+        shutil.rmtree(self._dir(key), ignore_errors=True)
+
+    def entries(self):
+        """
+        Per-entry (key, last access time, bytes), oldest access first
+        """
+        out = []
+        for key in os.listdir(self.path):
+            if '.' in key:
+                # not an entry, but one being written or replaced
+                continue
+            d = self._dir(key)
+            try:
+                atime = os.stat(self._manifest(key)).st_mtime
+                size = sum(os.path.getsize(os.path.join(d, f))
+                           for f in os.listdir(d))
+            except OSError:
+                continue
+            out.append((key, atime, size))
+        return sorted(out, key=lambda e: e[1])
+
+    def evict(self):
+        """
+        Drop expired entries, then least recently read ones over max_bytes
+
+        Entries still being written are not touched, unless abandoned for
+        longer than ``ttl``.
+        """
+        for key in os.listdir(self.path):
+            if '.' in key:
+                try:
+                    stale = time.time() - os.stat(self._dir(key)).st_mtime
+                except OSError:
+                    continue
+                if stale > self.ttl:
+                    self.remove(key)
+                continue
+            manifest = self._read_manifest(key)
+            if manifest is not None and self._expired(manifest):
+                self.remove(key)
+        entries = self.entries()
+        total = sum(e[2] for e in entries)
+        for key, atime, size in entries:
+            if total <= self.max_bytes:
+                break
+            self.remove(key)
+            total -= size
@@ -1,14 +1,541 @@
 
 import base64
+from concurrent.futures import ThreadPoolExecutor
+import contextvars
+import functools
+import inspect
 import io
-import requests
-import pandas as pd
+import random
+import re
+import threading
+import zlib
+from .metrics import FIELDS as _EVENT_FIELDS, QueryReport
+from urllib.parse import quote
 import time
 import warnings
 # because Splunk connections are against a self-signed cert, all connections
 # would raise a warning
 warnings.filterwarnings('ignore', module='urllib3.connectionpool')
 
+
+@functools.lru_cache()
+def _transient():
+    """
+    Failures worth retrying: the connection, not the request, was at fault
+    """
+    import requests
+    import urllib3
+    return (requests.ConnectionError, requests.Timeout,
+            requests.exceptions.ChunkedEncodingError,
+            urllib3.exceptions.ProtocolError,
+            urllib3.exceptions.ReadTimeoutError)
+
+
+def _connect_failed(e):
+    """
+    Whether a transient failure happened while connecting, so that the
+    request never reached the server
+    """
+    import requests
+    import urllib3
+    if isinstance(e, requests.ConnectTimeout):
+        return True
+    reason = e.args[0] if e.args else None
+    # requests wraps urllib3's MaxRetryError, which holds the cause
+    reason = getattr(reason, 'reason', reason)
+    return isinstance(reason, urllib3.exceptions.ConnectTimeoutError)
+
+
+# the report of the read call in progress, if any; see _reported
+_report = contextvars.ContextVar('splunk_report', default=None)
+# the categories shared by the chunks of that call; see _compact
+_categories = contextvars.ContextVar('splunk_categories', default=None)
+
+
+def _in_context(fn):
+    """
+    Make fn run in (a copy of) the caller's context when called from
+    another thread, e.g., by an executor, so that it reports to the same
+    read call
+    """
+    ctx = contextvars.copy_context()
+    return lambda *args: ctx.copy().run(fn, *args)
+
+
+def _reported(method):
+    """
+    Give each call of a read method a fresh ``QueryReport``, kept as
+    ``.last_report`` and, for a returned dataframe, as
+    ``df.attrs['splunk']``; and a fresh set of categories for its chunks
+    to share (see ``SplunkConnect._compact``)
+
+    Iterators are reported on chunk by chunk, each chunk carrying the
+    figures so far.
+    """
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        import pandas as pd
+        report = self.last_report = QueryReport()
+        categories = {}
+        token = _report.set(report)
+        cat_token = _categories.set(categories)
+        t0 = time.perf_counter()
+        try:
+            out = method(self, *args, **kwargs)
+        finally:
+            report.totals['wall'] += time.perf_counter() - t0
+            _report.reset(token)
+            _categories.reset(cat_token)
+        if inspect.isgenerator(out):
+            return _iter_reported(report, categories, out)
+        if isinstance(out, pd.DataFrame):
+            out.attrs['splunk'] = report.as_dict()
+        return out
+    return wrapper
+
+
+def _iter_reported(report, categories, chunks):
+    import pandas as pd
+    while True:
+        token = _report.set(report)
+        cat_token = _categories.set(categories)
+        t0 = time.perf_counter()
+        try:
+            df = next(chunks)
+        except StopIteration:
+            return
+        finally:
+            report.totals['wall'] += time.perf_counter() - t0
+            _report.reset(token)
+            _categories.reset(cat_token)
+        if isinstance(df, pd.DataFrame):
+            df.attrs['splunk'] = report.as_dict()
+        yield df
+
+
+def _sharing_categories(fn):
+    """
+    Make fn share the categories of the read call in progress when called
+    later, e.g., by dask
+    """
+    return functools.partial(_call_sharing, _categories.get(), fn)
+
+
+def _call_sharing(categories, fn, *args, **kwargs):
+    token = _categories.set(categories)
+    try:
+        return fn(*args, **kwargs)
+    finally:
+        _categories.reset(token)
+
+
+def _decode(data, encoding):
+    """
+    Decompress a response body sent with the given Content-Encoding
+    """
+    if encoding == 'gzip':
+        return zlib.decompressobj(47).decompress(data)
+    if encoding == 'deflate':
+        try:
+            return zlib.decompress(data)
+        except zlib.error:
+            # some servers send raw deflate without the zlib header
+            return zlib.decompress(data, -15)
+    return data
+
+
+def _parse_csv(data, parser='pandas', as_table=False, meta=None, **kwargs):
+    """
+    Parse a CSV payload (bytes) into a dataframe or arrow table
+
+    With ``parser='arrow'``, uses pyarrow's multithreaded reader and kwargs
+    go to ``pyarrow.csv.read_csv`` (e.g., ``convert_options``); the output
+    is a ``pyarrow.Table`` if ``as_table``, else an Arrow-backed dataframe.
+    Otherwise, kwargs go to ``pd.read_csv``.
+
+    If ``meta`` (an empty dataframe) is given, the output has its dtypes,
+    and an empty payload gives a copy of it; unless kwargs give a single
+    ``dtype`` for all columns (e.g., ``dtype=str``), which then wins.
+    """
+    import pandas as pd
+    if parser not in ('pandas', 'arrow'):
+        raise ValueError("parser must be 'pandas' or 'arrow'")
+    if as_table and parser != 'arrow':
+        raise ValueError("as_table requires parser='arrow'")
+    if meta is not None and not data.strip():
+        return meta.copy()
+    user_dtype = kwargs.get('dtype') if parser == 'pandas' else None
+    if user_dtype is not None and not isinstance(user_dtype, dict):
+        # one dtype for all columns, as the user asked
+        meta = None
+    if parser == 'pandas' and meta is not None:
+        # parse straight to the known types, rather than re-inferring
+        dtype = {c: t for c, t in meta.dtypes.items()
+                 if not pd.api.types.is_datetime64_any_dtype(t)
+                 and not isinstance(t, pd.CategoricalDtype)}
+        dtype.update(user_dtype or {})
+        kwargs['dtype'] = dtype
+    try:
+        if parser == 'pandas':
+            df = pd.read_csv(io.BytesIO(data), **kwargs)
+        else:
+            import pyarrow.csv
+            table = pyarrow.csv.read_csv(pyarrow.py_buffer(data), **kwargs)
+            if as_table:
+                return table
+            df = table.to_pandas(types_mapper=pd.ArrowDtype)
+        if meta is not None:
+            df = _coerce(df, meta)
+    except ValueError as e:
+        if meta is None:
+            raise
+        raise ValueError('Data do not match the dtypes inferred from '
+                         'samples (%s); pass dtype= to override' % e)
+    return df
+
+
+def _coerce(df, meta):
+    """
+    Cast the columns of df to the dtypes of the same columns in meta
+
+    Categorical columns are left alone: their categories are not known in
+    advance, but are set by ``SplunkConnect._compact``.
+    """
+    import pandas as pd
+    cast = {c: t for c, t in meta.dtypes.items()
+            if c in df.columns and df[c].dtype != t
+            and not isinstance(t, pd.CategoricalDtype)}
+    return df.astype(cast) if cast else df
+
+
+def _nullable(meta):
+    """
+    Switch numpy int/bool columns to pandas' nullable types, so that chunks
+    with missing values keep the same dtype
+    """
+    import numpy as np
+    cast = {}
+    for c, t in meta.dtypes.items():
+        if not isinstance(t, np.dtype):
+            continue
+        if t.kind == 'b':
+            cast[c] = 'boolean'
+        elif t.kind in 'iu':
+            cast[c] = '%sInt%i' % ('U' if t.kind == 'u' else '', t.itemsize * 8)
+    return meta.astype(cast) if cast else meta
+
+
+def _downcast(df):
+    """
+    Switch numeric columns to the smallest dtype that holds every value
+    exactly: integers by their range, floats to 32 bits only if no value
+    changes
+    """
+    import numpy as np
+    import pandas as pd
+    cast = {}
+    for c, t in df.dtypes.items():
+        if (isinstance(t, pd.ArrowDtype) or pd.api.types.is_bool_dtype(t)
+                or not pd.api.types.is_numeric_dtype(t)):
+            continue
+        s = df[c]
+        if pd.api.types.is_integer_dtype(t):
+            kind = ('integer' if pd.api.types.is_signed_integer_dtype(t)
+                    else 'unsigned')
+            small = pd.to_numeric(s, downcast=kind).dtype
+        elif t.itemsize > 4:
+            small = 'float32' if isinstance(t, np.dtype) else 'Float32'
+            if not ((s.astype(small).astype(t) == s) | s.isna()).all():
+                continue
+        else:
+            continue
+        if small != t:
+            cast[c] = small
+    return df.astype(cast) if cast else df
+
+
+def _unify_categories(parts):
+    """
+    Give each categorical column the same categories in every part, so
+    that concatenation keeps it categorical
+    """
+    import pandas as pd
+    if not parts or not hasattr(parts[0], 'dtypes'):
+        return parts
+    cats = [c for c, t in parts[0].dtypes.items()
+            if isinstance(t, pd.CategoricalDtype)]
+    for c in cats:
+        # categories only ever grow, so the longest list holds the others
+        dtype = max((p[c].dtype for p in parts),
+                    key=lambda t: len(t.categories))
+        parts = [p if p[c].dtype == dtype else p.astype({c: dtype})
+                 for p in parts]
+    return parts
+
+
+def _concat_frames(frames):
+    """
+    Concatenate dataframes, renumbering the rows unless the parse options
+    gave them an index of their own (e.g., ``index_col=``)
+    """
+    import pandas as pd
+    default = all(isinstance(f.index, pd.RangeIndex) for f in frames)
+    return pd.concat(frames, ignore_index=default)
+
+
+def _dask_meta(meta):
+    """
+    Mark categorical columns' categories as unknown, since they are only
+    filled in as each partition is read
+    """
+    from dask.dataframe.utils import clear_known_categories
+    return clear_known_categories(meta)
+
+
+def _time_index(df):
+    """
+    Set ``_time``, as nanosecond UTC datetimes, as the index
+    """
+    import pandas as pd
+    t = pd.to_datetime(df['_time'], utc=True).astype('datetime64[ns, UTC]')
+    return df.assign(_time=t).set_index('_time')
+
+
+class _SocketReader:
+    """
+    File-like view of a streamed response, returning each read as soon as
+    any bytes have arrived, and at most ``buffer_size`` bytes at a time
+
+    Deliberately not an ``io`` class: pandas would wrap that in a
+    TextIOWrapper, which blocks until each of its reads is filled.
+    """
+
+    def __init__(self, r, buffer_size=2**20, throttle=None, on_close=None):
+        self.r = r
+        self.buffer_size = buffer_size
+        self.throttle = throttle
+        self.on_close = on_close
+        self._wire = 0
+        self.busy = 0  # seconds spent waiting for and decoding data
+        # urllib3 < 2 has no read1; read blocks until the request is filled
+        self._read = getattr(r.raw, 'read1', r.raw.read)
+
+    def read(self, size=-1):
+        t0 = time.perf_counter()
+        if size is None or size < 0:
+            out = self.r.raw.read()
+        else:
+            out = self._read(min(size, self.buffer_size))
+        self.busy += time.perf_counter() - t0
+        # bytes on the wire, which differ from len(out) if compressed
+        wire = self.r.raw.tell()
+        if self.throttle is not None:
+            self.throttle.consume(wire - self._wire)
+        self._wire = wire
+        return out
+
+    def __iter__(self):
+        return iter(self.r.raw)
+
+    def close(self):
+        self.r.close()
+        if self.on_close is not None:
+            on_close, self.on_close = self.on_close, None
+            on_close(bytes=self._wire, seconds=self.busy)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+def _iter_csv(f, chunksize, **kwargs):
+    """
+    Parse CSV from a file-like object incrementally, yielding dataframes
+    """
+    import pandas as pd
+    try:
+        reader = pd.read_csv(f, chunksize=chunksize, **kwargs)
+    except pd.errors.EmptyDataError:
+        # no results at all: Splunk sends an empty body
+        return
+    with reader:
+        for df in reader:
+            yield df
+
+
+def _to_epoch(t):
+    """
+    Seconds since the epoch for a timestamp, datetime, ISO string or number
+    """
+    import pandas as pd
+    if isinstance(t, (int, float)):
+        return float(t)
+    t = pd.Timestamp(t)
+    if t.tzinfo is None:
+        t = t.tz_localize('UTC')
+    return t.timestamp()
+
+
+def _time_slices(earliest, latest, partition):
+    """
+    Split [earliest, latest) into consecutive (start, end) epoch pairs
+
+    ``partition`` is a pandas frequency or timedelta, e.g., ``'1h'``; the
+    last slice may be shorter. The bounds must be absolute times, since
+    each slice becomes its own job.
+    """
+    import pandas as pd
+    if earliest is None or latest is None:
+        raise ValueError('Partitioning by time needs both earliest and latest')
+    start, end = _to_epoch(earliest), _to_epoch(latest)
+    if end <= start:
+        raise ValueError('Cannot partition by time: latest (%s) is not after '
+                         'earliest (%s)' % (latest, earliest))
+    step = pd.Timedelta(partition).total_seconds()
+    if step <= 0:
+        raise ValueError('partition must be a positive time interval')
+    edges = [start + i * step for i in range(int(-(-(end - start) // step)))]
+    return list(zip(edges, edges[1:] + [end]))
+
+
+def _fields_param(columns):
+    """
+    Query-string suffix asking the results endpoints for only these fields
+    """
+    if columns is None:
+        return ''
+    return ''.join('&f=' + quote(c, safe='') for c in columns)
+
+
+def _fields_clause(columns):
+    """
+    SPL pipe keeping only these fields, for searches that have no job
+    """
+    if columns is None:
+        return ''
+    return ' | fields ' + ', '.join(
+        c if re.fullmatch(r'[\w.:]+', c) else '"%s"' % c.replace('"', '\\"')
+        for c in columns)
+
+
+_OPS = {'=': '==', '==': '==', '!=': '!=', '<': '<', '<=': '<=', '>': '>',
+        '>=': '>='}
+
+
+def _spl_value(v):
+    import numpy as np
+    if isinstance(v, (bool, np.bool_)):
+        return '"%s"' % str(v).lower()
+    if isinstance(v, (int, float, np.integer, np.floating)):
+        return repr(v.item() if isinstance(v, np.generic) else v)
+    return '"%s"' % str(v).replace('\\', '\\\\').replace('"', '\\"')
+
+
+def _spl_field(name):
+    # in eval expressions, unusual field names go in single quotes
+    if re.fullmatch(r'[A-Za-z_]\w*', name):
+        return name
+    return "'%s'" % name.replace("'", "\\'")
+
+
+def _filter_term(field, op, value):
+    f = _spl_field(field)
+    if op in ('in', 'not in'):
+        # a string would be taken apart into its characters
+        if isinstance(value, (str, bytes)) or not hasattr(value, '__iter__'):
+            raise ValueError('%r needs a list of values, not %r'
+                             % (op, value))
+        values = list(value)
+        if not values:
+            return 'false()' if op == 'in' else 'true()'
+        term = 'in(%s, %s)' % (f, ', '.join(_spl_value(v) for v in values))
+        return term if op == 'in' else 'NOT ' + term
+    if op not in _OPS:
+        raise ValueError('Unsupported filter operator: %r' % (op, ))
+    if value is None:
+        if op in ('=', '=='):
+            return 'isnull(%s)' % f
+        if op == '!=':
+            return 'isnotnull(%s)' % f
+        raise ValueError('Only = and != can compare with None')
+    return '%s%s%s' % (f, _OPS[op], _spl_value(value))
+
+
+def _filter_clause(filters):
+    """
+    SPL ``| where`` clause for pyarrow/dask-style row filters
+
+    ``filters`` is a list of ``(field, op, value)`` terms (tuples or, as
+    from JSON, lists), all of which must hold, or a list of such lists, any
+    of which must hold. ``op`` is one of ``=, ==, !=, <, <=, >, >=, in,
+    not in``; comparing with None tests for a missing field.
+    """
+    if not filters:
+        return ''
+    if filters[0] and isinstance(filters[0][0], str):
+        # a single conjunction, as pyarrow tells them apart
+        filters = [filters]
+    ors = []
+    for conj in filters:
+        if not conj:
+            raise ValueError('Empty filter conjunction')
+        ors.append(' AND '.join(_filter_term(*t) for t in conj))
+    if len(ors) == 1:
+        return ' | where ' + ors[0]
+    return ' | where ' + ' OR '.join('(%s)' % o for o in ors)
+
+
+class PollScheduler:
+    """
+    Decide how long to sleep between polls of a running job
+
+    Starts fast and backs off exponentially; once the job reports progress,
+    aims the next poll at its predicted finish instead. Waits are always
+    within ``[minimum, maximum]`` seconds.
+
+    Also records the number of polls and the wasted wait: the time between
+    the job finishing (by its own ``runDuration``) and us noticing.
+    """
+
+    def __init__(self, minimum=0.05, maximum=1, backoff=2):
+        self.minimum = minimum
+        self.maximum = maximum
+        self.backoff = backoff
+        self.wait = minimum
+        self.polls = 0
+        self.time0 = time.time()
+        self.wasted = 0
+
+    def next_wait(self, status):
+        """
+        Seconds to sleep, given the latest job status content
+        """
+        self.polls += 1
+        wait = self.wait
+        self.wait = min(self.wait * self.backoff, self.maximum)
+        progress = float(status.get('doneProgress', 0))
+        duration = float(status.get('runDuration', 0))
+        if 0 < progress < 1 and duration > 0:
+            wait = duration * (1 - progress) / progress
+        return min(max(wait, self.minimum), self.maximum)
+
+    def done(self, status):
+        """
+        Record the final status; returns the stats
+        """
+        self.polls += 1
+        elapsed = time.time() - self.time0
+        self.wasted = max(0, elapsed - float(status.get('runDuration', 0)))
+        return self.stats
+
+    @property
+    def stats(self):
+        return {'polls': self.polls, 'wasted': self.wasted,
+                'elapsed': time.time() - self.time0}
+
+
 class SplunkConnect:
 
     """
@@ -20,30 +547,361 @@ class SplunkConnect:
 
     Main user methods: read_pandas, read_pandas_iter, read_dask
 
+    Each ``read_*`` call breaks its time down into dispatch, queueing, run,
+    download, decompression and parsing, with Splunk's job statistics, in
+    a ``metrics.QueryReport``: it is kept as ``.last_report``, and its
+    figures are put in ``df.attrs['splunk']`` of the dataframes returned.
+    For ``read_dask``, the report only covers the work done before
+    ``compute``.
+
     Parameters
     ----------
-    base_url: str
-        Address to contact Splunk on, e.g., ``https://localhost:8089``
+    base_url: str or list of str
+        Address to contact Splunk on, e.g., ``https://localhost:8089``; or
+        the addresses of the members of a search head cluster. Results are
+        then downloaded from all healthy members in turn, and any call
+        fails over to another member if one stops answering (see
+        ``check_health``).
     key: str
         Auth key, if known
+    pool_connections: int
+        Number of per-host connection pools to cache in the HTTP session
+    pool_maxsize: int
+        Maximum number of connections kept open to any one host; should be
+        at least the number of threads downloading concurrently
+    keep_alive: bool
+        If False, ask the server to close each connection after every
+        request (the behaviour before sessions were pooled)
+    cache: ResultCache or None
+        If given, ``read_pandas`` and ``read_dask`` store results in it and
+        serve repeat reads of the same query, time range and parse options
+        from local disk
+    jobs: JobRegistry or None
+        If given, the read methods reuse the live job of an identical query
+        dispatched recently, rather than starting a new one
+    compress: bool
+        Ask for gzip/deflate compressed responses, decompressed as they
+        stream in; CSV results typically shrink several-fold, at some CPU
+        cost on both ends. Set False on fast links to save the CPU.
+    retries: int
+        Times to retry a request that fails with a ``RETRY_STATUS`` code or
+        a broken connection, after a random (jittered) wait that grows
+        exponentially. Streamed downloads resume from the last row parsed.
+        Requests that start searches are only retried if the server
+        refused them or could not be reached, so as not to run a search
+        twice.
+    throttle: Throttle, dict or None
+        If given, limits the requests in flight and bytes per second to
+        this search head, adapting to 429/503 responses; share one
+        instance among all connectors to the same server. With several
+        search heads, a dict of URL: Throttle limits each separately.
+    hooks: list of callables
+        Each is called with an event dict for every REST call, streamed
+        read and parse step, giving timings, bytes, rows, HTTP status and
+        retries; see ``metrics.Metrics`` for the fields and for a hook
+        that aggregates them. More can be appended to ``.hooks``.
     """
 
-    POLL_TIME = 1  # seconds to sleep between successive polls
+    POLL_TIME = 1  # maximum seconds to sleep between successive polls
+    POLL_MIN = 0.05  # seconds to sleep after the first poll
+    POLL_BACKOFF = 2  # factor to lengthen the sleep by on each poll
     TIMEOUT = 600  # maximum seconds to wait for query to finish
+    MAX_JOBS = 8  # concurrent search jobs when partitioning by time
+    RETRY_WAIT = 0.5  # seconds; the maximum wait doubles on each retry
+    RETRY_MAX_WAIT = 30  # seconds; cap on the wait before any retry
+    RETRY_STATUS = (429, 500, 502, 503, 504)  # HTTP codes worth retrying
+    REFUSED_STATUS = (429, 503)  # codes meaning the request was not acted on
+    HEALTH_RETRY = 30  # seconds to avoid a search head after it fails
+    SCHEMA_TTL = 300  # seconds for which an inferred schema is reused
+    SCHEMA_MAX = 64  # most inferred schemas kept
+    POLL_STATS_MAX = 64  # most jobs' polling stats kept
+    # fields made categorical by ``compact=True``
+    CATEGORICAL = ('host', 'source', 'sourcetype', 'index', 'splunk_server')
 
-    def __init__(self, base_url, key=None):
-        self.url = base_url
+    def __init__(self, base_url, key=None, pool_connections=10, pool_maxsize=10,
+                 keep_alive=True, cache=None, jobs=None, compress=True,
+                 retries=3, throttle=None, hooks=None):
+        self.urls = [base_url] if isinstance(base_url, str) else list(base_url)
+        self.url = self.urls[0]
         self.key = key
+        self.cache = cache
+        self.jobs = jobs
+        self.head = {}
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.keep_alive = keep_alive
+        self.compress = compress
+        self.retries = retries
+        self.throttle = throttle
+        self.hooks = list(hooks or [])
+        self.last_report = None
+        self.poll_stats = {}
+        self.schemas = {}
+        self.down = {}  # URL: time until which it is not used
+        self._turn = 0
+        self._lock = threading.Lock()
+        self.session = self._make_session()
         if key:
             self.auth_head(key)
 
+    def _make_session(self):
+        """
+        HTTP session shared by all calls, so that connections are reused
+        """
+        import requests
+        s = requests.Session()
+        s.verify = False
+        adapter = requests.adapters.HTTPAdapter(
+            pool_connections=self.pool_connections,
+            pool_maxsize=self.pool_maxsize)
+        s.mount('https://', adapter)
+        s.mount('http://', adapter)
+        if not self.keep_alive:
+            s.headers['Connection'] = 'close'
+        s.headers['Accept-Encoding'] = ('gzip, deflate' if self.compress
+                                        else 'identity')
+        return s
+
+    def __getstate__(self):
+        # sessions hold live sockets; each process/worker makes its own
+        state = self.__dict__.copy()
+        del state['session'], state['_lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+        self.session = self._make_session()
+
+    def _request(self, method, path, balance=False, name=None,
+                 idempotent=None, **kwargs):
+        """
+        Make a call against the server on the pooled session
+
+        Transient failures are retried up to ``.retries`` times (see
+        ``_retry_wait``); any other error status raises ``HTTPError``.
+        Calls that are not ``idempotent`` (by default, POSTs, which start
+        searches) are only retried if the server cannot have acted on
+        them: on failing to connect, or on a ``REFUSED_STATUS``; retrying
+        after anything else could start the same search twice.
+        With ``balance``, the call may go to any healthy search head in
+        turn, rather than to the first healthy one; either way, a failed
+        attempt moves on to another member at once, if there is one.
+
+        The call, with all its retries, is reported to the hooks as one
+        'request' event called ``name``.
+        """
+        kwargs.setdefault('headers', self.head)
+        if idempotent is None:
+            idempotent = method != 'POST'
+        retry_status = self.RETRY_STATUS if idempotent else [
+            s for s in self.RETRY_STATUS if s in self.REFUSED_STATUS]
+        t0 = time.perf_counter()
+        r = url = error = None
+        attempt = 0
+        try:
+            for attempt in range(self.retries + 1):
+                last = attempt == self.retries
+                url = self._pick_url(balance)
+                r = None
+                try:
+                    r = self._send(method, url, path, **kwargs)
+                except _transient() as e:
+                    if last or not (idempotent or _connect_failed(e)):
+                        raise
+                    if not self._failover(url):
+                        time.sleep(self._retry_wait(attempt))
+                    continue
+                if r.status_code in retry_status and not last:
+                    r.close()
+                    if r.status_code < 500 or not self._failover(url):
+                        time.sleep(self._retry_wait(attempt, r))
+                    continue
+                r.raise_for_status()
+                return r
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            if self._observed():
+                self._emit(
+                    kind='request', name=name, url=url, method=method,
+                    status=None if r is None else r.status_code,
+                    retries=attempt, seconds=time.perf_counter() - t0,
+                    bytes=(r.raw.tell() if r is not None
+                           and not kwargs.get('stream') else None),
+                    error=error)
+
+    def _observed(self):
+        """
+        Whether anything (a hook or a read call's report) wants events
+        """
+        return bool(self.hooks) or _report.get() is not None
+
+    def _emit(self, **event):
+        """
+        Pass an event to every hook, and to the report of the read call in
+        progress, with all fields present
+        """
+        event = dict(dict.fromkeys(_EVENT_FIELDS), **event)
+        for hook in self.hooks:
+            hook(event)
+        report = _report.get()
+        if report is not None:
+            report.add(event)
+
+    def _timed(self, chunks, name, f):
+        """
+        Pass on dataframes parsed from stream ``f``, reporting the time
+        taken to produce each, less that spent reading ``f``, as a 'parse'
+        event
+        """
+        chunks = iter(chunks)
+        while True:
+            t0, busy = time.perf_counter(), f.busy
+            try:
+                df = next(chunks)
+            except StopIteration:
+                return
+            if self._observed():
+                self._emit(kind='parse', name=name, rows=len(df),
+                           seconds=time.perf_counter() - t0 - f.busy + busy)
+            yield df
+
+    def _pick_url(self, balance=False):
+        """
+        Search head for the next call: the first healthy one, or with
+        ``balance`` each healthy one in turn
+
+        If none is healthy, the one due to come back soonest.
+        """
+        now = time.time()
+        with self._lock:
+            up = [u for u in self.urls if self.down.get(u, 0) <= now]
+            if not up:
+                return min(self.urls, key=self.down.get)
+            if not balance:
+                return up[0]
+            self._turn += 1
+            return up[self._turn % len(up)]
+
+    def _failover(self, url):
+        """
+        Stop using a failed search head for ``HEALTH_RETRY`` seconds;
+        True if another is available to use instead
+        """
+        now = time.time()
+        with self._lock:
+            self.down[url] = now + self.HEALTH_RETRY
+            return any(self.down.get(u, 0) <= now for u in self.urls)
+
+    def check_health(self):
+        """
+        Ask every search head for its health, marking unhealthy ones down
+
+        A member is healthy if it answers ``/services/server/health/splunkd``
+        with any status but red. Returns a dict of URL: bool.
+        """
+        import requests
+        def check(url):
+            try:
+                r = self.session.get(
+                    url + '/services/server/health/splunkd?output_mode=json',
+                    headers=self.head, timeout=10)
+                r.raise_for_status()
+                health = r.json()['entry'][0]['content']['health']
+                return health != 'red'
+            except (requests.RequestException, KeyError, ValueError):
+                return False
+
+        with ThreadPoolExecutor(len(self.urls)) as ex:
+            out = dict(zip(self.urls, ex.map(check, self.urls)))
+        now = time.time()
+        with self._lock:
+            for url, ok in out.items():
+                if ok:
+                    self.down.pop(url, None)
+                else:
+                    self.down[url] = now + self.HEALTH_RETRY
+        return out
+
+    def _throttle(self, url):
+        if isinstance(self.throttle, dict):
+            return self.throttle.get(url)
+        return self.throttle
+
+    def _send(self, method, url, path, **kwargs):
+        """
+        Make one attempt at a request, within the throttle's limits
+
+        A streamed response gives up its slot once the headers arrive;
+        its body is metered by the throttle's byte rate as it is read.
+        """
+        stream = kwargs.pop('stream', False)
+        throttle = self._throttle(url)
+        if throttle is None:
+            r = self.session.request(method, url + path, stream=True,
+                                     **kwargs)
+            return r if stream else self._load(r)
+        started = throttle.acquire()
+        r = None
+        try:
+            r = self.session.request(method, url + path, stream=True,
+                                     **kwargs)
+            if not stream:
+                r = self._load(r)
+        finally:
+            after = r is not None and r.headers.get('Retry-After')
+            throttle.release(
+                started, None if r is None else r.status_code,
+                float(after) if after and after.isdigit() else None)
+        if not stream:
+            throttle.consume(r.raw.tell())
+        return r
+
+    def _load(self, r):
+        """
+        Read the whole body of a response, decompressing it separately so
+        that the time taken can be reported
+        """
+        try:
+            raw = r.raw.read(decode_content=False)
+        finally:
+            r.raw.release_conn()
+        encoding = r.headers.get('Content-Encoding')
+        if encoding and raw:
+            t0 = time.perf_counter()
+            r._content = _decode(raw, encoding)
+            if self._observed():
+                self._emit(kind='decompress', bytes=len(raw),
+                           seconds=time.perf_counter() - t0)
+        else:
+            r._content = raw
+        r._content_consumed = True
+        return r
+
+    def _retry_wait(self, attempt, r=None):
+        """
+        Seconds to sleep before retry number ``attempt`` (from 0)
+
+        The server's Retry-After, if given, else "full jitter": uniform
+        between zero and an exponentially growing cap, so that many
+        clients failing together do not retry together.
+        """
+        after = r is not None and r.headers.get('Retry-After')
+        if after and after.isdigit():
+            return min(float(after), self.RETRY_MAX_WAIT)
+        return random.uniform(0, min(self.RETRY_MAX_WAIT,
+                                     self.RETRY_WAIT * 2 ** attempt))
+
     def auth(self, user, pw):
         """
         Login to splunk and get a session key
         """
-        url = self.url + '/services/auth/login?output_mode=json'
-        r = requests.post(url, verify=False, data={'username': user, 
-                                               'password': pw})
+        # logging in twice does no harm
+        r = self._request('POST', '/services/auth/login?output_mode=json',
+                          name='auth', idempotent=True,
+                          data={'username': user, 'password': pw})
         self.key = r.json()['sessionKey']
         self.auth_head(self.key)
     
@@ -70,54 +928,157 @@ class SplunkConnect:
             return "search " + q
         return q
     
+    @staticmethod
+    def _filter_query(q, filters):
+        """
+        Append the ``| where`` clause for ``filters`` to the query
+        """
+        if not filters:
+            return q
+        if q is None:
+            raise ValueError('filters need a query; they cannot be applied '
+                             'to an existing job')
+        return q + _filter_clause(filters)
+
     def list_saved_searches(self):
         """
         Get saved search names/definitions as a dict
         """
-        r = requests.get(self.url + '/services/saved/searches?output_mode=json',
-                          headers=self.head, verify=False)
+        r = self._request('GET', '/services/saved/searches?output_mode=json',
+                          name='saved_searches')
         out = r.json()['entry']
         return {o['name']:o['content']['search'] for o in out}
     
-    def start_query(self, q):
+    def start_query(self, q, earliest=None, latest=None):
         """
         Initiate a query as a job
+
+        ``earliest`` and ``latest`` bound the time range searched, in any
+        form Splunk accepts (epoch seconds, ISO time or relative like
+        ``-1h``).
         """
         q = self._sanitize_query(q)
-        r = requests.post(self.url + '/services/search/jobs?output_mode=json',
-                          verify=False, data={'search': q},
-                          headers=self.head)
+        data = {'search': q}
+        if earliest is not None:
+            data['earliest_time'] = earliest
+        if latest is not None:
+            data['latest_time'] = latest
+        r = self._request('POST', '/services/search/jobs?output_mode=json',
+                          name='dispatch', data=data)
         return r.json()['sid']
     
+    def poll_status(self, sid):
+        """
+        Get the full status content of a job
+        """
+        path =  '/services/search/jobs/{}?output_mode=json'.format(sid)
+        r = self._request('GET', path, name='status')
+        return r.json()['entry'][0]['content']
+
     def poll_query(self, sid):
         """
         Check the status of a job
         """
-        path =  '/services/search/jobs/{}?output_mode=json'.format(sid)
-        r = requests.get(self.url +path,  verify=False, headers=self.head)
-        out = r.json()['entry'][0]['content']
+        out = self.poll_status(sid)
         return out['isDone'], out.get('resultCount', 0)
 
+    def _scheduler(self):
+        return PollScheduler(self.POLL_MIN, self.POLL_TIME, self.POLL_BACKOFF)
+
     def wait_poll(self, sid):
-        time0 = time.time()
+        """
+        Poll until the job is done, returning (done, result count)
+
+        The interval between polls adapts to the job's progress (see
+        ``PollScheduler``); the number of polls and wasted wait are stored
+        in ``.poll_stats[sid]``, for the latest ``POLL_STATS_MAX`` jobs.
+        """
+        sched = self._scheduler()
         while True:
-            done, count = self.poll_query(sid)
-            if done:
-                return done, count
-            if time.time() - time0 > self.TIMEOUT:
+            status = self.poll_status(sid)
+            if status['isDone']:
+                self._record_poll(sid, sched.done(status))
+                self._job_done(sid, status, sched)
+                return True, status.get('resultCount', 0)
+            if time.time() - sched.time0 > self.TIMEOUT:
                 raise RuntimeError("Timeout waiting for Splunk to finish query")
-            time.sleep(self.POLL_TIME)
+            time.sleep(sched.next_wait(status))
 
-    def get_query_result(self, sid, offset=0, count=0):
+    def _record_poll(self, sid, stats):
+        self.poll_stats.pop(sid, None)
+        self.poll_stats[sid] = stats
+        while len(self.poll_stats) > self.POLL_STATS_MAX:
+            # oldest first
+            self.poll_stats.pop(next(iter(self.poll_stats)), None)
+
+    @staticmethod
+    def _job_done(sid, status, sched=None):
+        report = _report.get()
+        if report is not None:
+            report.job(sid, status, None if sched is None
+                       else time.time() - sched.time0)
+
+    def get_query_result(self, sid, offset=0, count=0, preview=False,
+                         columns=None):
         """
         Fetch query output (as CSV)
+
+        With ``preview``, read from ``results_preview``, which serves the
+        rows produced so far by a job that is still running. With
+        ``columns``, the server sends only those fields.
         """
-        path = ('/services/search/jobs/{}/results/?output_mode=csv'
-                '&offset={}&count={}').format(sid, offset, count)
-        r = requests.get(self.url + path,  verify=False, headers=self.head)
+        path = ('/services/search/jobs/{}/{}/?output_mode=csv'
+                '&offset={}&count={}').format(
+                    sid, 'results_preview' if preview else 'results', offset,
+                    count) + _fields_param(columns)
+        r = self._request('GET', path, balance=True,
+                          name='results_preview' if preview else 'results')
         return r.content
 
-    def get_dataframe(self, sid, offset=0, count=0, **kwargs):
+    def get_query_stream(self, sid, offset=0, count=0, buffer_size=2**20,
+                         columns=None):
+        """
+        Open query output (as CSV) as a file-like object reading the socket
+
+        Nothing is buffered beyond ``buffer_size`` bytes; close the returned
+        object to release the connection.
+        """
+        path = ('/services/search/jobs/{}/results/?output_mode=csv'
+                '&offset={}&count={}').format(
+                    sid, offset, count) + _fields_param(columns)
+        r = self._request('GET', path, balance=True, stream=True,
+                          name='results')
+        return self._stream(r, buffer_size, 'results')
+
+    def export_stream(self, q, buffer_size=2**20, columns=None):
+        """
+        Run a query on the export endpoint, returning its CSV output as a
+        file-like object reading the socket
+
+        Results arrive while the search is still running; no job is left to
+        poll or fetch from. With ``columns``, a ``| fields`` clause is
+        appended to the query, so that only those fields are sent.
+        """
+        q = self._sanitize_query(q) + _fields_clause(columns)
+        r = self._request('POST', '/services/search/jobs/export',
+                          data={'search': q, 'output_mode': 'csv'},
+                          stream=True, name='export')
+        return self._stream(r, buffer_size, 'export')
+
+    def _stream(self, r, buffer_size, name=None):
+        r.raw.decode_content = True
+        # the parser may read again after EOF
+        r.raw.auto_close = False
+        url = next((u for u in self.urls if r.url.startswith(u)), None)
+        on_close = None
+        if self._observed():
+            def on_close(**event):
+                self._emit(kind='read', name=name, url=url, **event)
+        return _SocketReader(r, buffer_size, self._throttle(url), on_close)
+
+    def get_dataframe(self, sid, offset=0, count=0, parser='pandas',
+                      as_table=False, preview=False, meta=None, columns=None,
+                      compact=False, **kwargs):
         """
         Read a chunk from completed query, return a pandas dataframe
 
@@ -129,47 +1090,486 @@ class SplunkConnect:
             Starting row
         count: int
             Number of rows to fetch
+        parser: 'pandas' or 'arrow'
+            Parse with ``pd.read_csv``, or with pyarrow's multithreaded CSV
+            reader, giving a dataframe with Arrow-backed columns
+        as_table: bool
+            With ``parser='arrow'``, return a ``pyarrow.Table`` instead
+        preview: bool
+            Read rows from a job that is still running
+        meta: pandas.DataFrame or None
+            Empty frame whose dtypes the output must have, e.g., from
+            ``infer_meta``
+        columns: list of str or None
+            Fields to fetch; the server sends only these, rather than the
+            parser discarding the rest after transfer
+        compact: bool
+            Make the ``CATEGORICAL`` fields categorical, with categories
+            shared by all chunks (see ``_compact``), and shrink numeric
+            columns where no value changes. With ``meta``, numeric dtypes
+            are fixed, so only the categories change.
+        kwargs: passed to pd.read_csv or pyarrow.csv.read_csv
+        """
+        txt = self.get_query_result(sid, offset, count, preview=preview,
+                                    columns=columns)
+        t0 = time.perf_counter()
+        df = _parse_csv(txt, parser=parser, as_table=as_table, meta=meta,
+                        **kwargs)
+        if compact and not as_table:
+            df = self._compact(df, downcast=meta is None)
+        if self._observed():
+            self._emit(kind='parse', name='results_preview' if preview
+                       else 'results', bytes=len(txt), rows=len(df),
+                       seconds=time.perf_counter() - t0)
+        return df
+
+    def _compact(self, df, downcast=True, categories=None):
+        """
+        Shrink a dataframe's memory: ``CATEGORICAL`` fields become
+        categoricals and, if ``downcast``, numbers take the smallest exact
+        dtype
+
+        Categories are shared by all chunks of one ``read_*`` call (or the
+        given dict of field: categories), and only ever grow, with new
+        values appended in order of first appearance; every chunk is given
+        all the categories seen so far. So codes never change meaning, and
+        chunks concatenate without re-encoding. Outside a read call, a
+        chunk has only its own values as categories.
+        """
+        import pandas as pd
+        if categories is None:
+            categories = _categories.get()
+        if categories is None:
+            categories = {}
+        cast = {}
+        for c in self.CATEGORICAL:
+            if c not in df.columns:
+                continue
+            values = df[c].dropna().unique()
+            with self._lock:
+                known = categories.get(c)
+                if known is None:
+                    known = pd.Index(values)
+                else:
+                    new = values[~pd.Index(values).isin(known)]
+                    if len(new):
+                        known = known.append(pd.Index(new))
+                categories[c] = known
+            cast[c] = pd.CategoricalDtype(known)
+        if cast:
+            df = df.astype(cast)
+        return _downcast(df) if downcast else df
+
+    def infer_meta(self, jobs, nsamples=4, sample_rows=20, key=None,
+                   columns=None, compact=False, **kwargs):
+        """
+        Infer the dtypes of a result from rows sampled throughout it
+
+        ``nsamples`` slices of ``sample_rows`` rows, spread evenly over all
+        the jobs' results, are fetched concurrently and parsed separately,
+        with the same parse options as the data will be, then combined by
+        column name, since jobs may differ in their fields and their order.
+        Integer and boolean columns become pandas' nullable types, so that
+        chunks with missing values do not change dtype.
+
+        Parameters
+        ----------
+        jobs: list of (sid, count)
+            As returned by ``_start_jobs``
+        nsamples: int
+            Number of places to sample
+        sample_rows: int
+            Rows in each sample
+        key: hashable or None
+            If given, the result is kept in ``.schemas[key]`` and reused
+            for ``SCHEMA_TTL`` seconds; at most ``SCHEMA_MAX`` are kept
+        columns: list of str or None
+            Fields to fetch, as for get_dataframe
+        compact: bool
+            Give the ``CATEGORICAL`` fields a categorical dtype, whose
+            categories are filled in as the data arrive
+        kwargs: passed to the CSV parser, as by get_dataframe
+
+        Returns an empty dataframe
+        """
+        import pandas as pd
+        if key is not None:
+            with self._lock:
+                t, meta = self.schemas.get(key, (0, None))
+            if time.time() - t < self.SCHEMA_TTL:
+                return meta
+        total = sum(count for sid, count in jobs)
+        starts = sorted({int(total * i / nsamples) for i in range(nsamples)})
+        samples = []
+        for start in starts or [0]:
+            for sid, count in jobs:
+                if start < count or not total:
+                    samples.append((sid, start))
+                    break
+                start -= count
+        with ThreadPoolExecutor(len(samples)) as ex:
+            parts = list(ex.map(_in_context(
+                lambda s: self.get_query_result(s[0], s[1], sample_rows,
+                                                columns=columns)),
+                samples))
+        frames = [_parse_csv(p, **kwargs) for p in parts if p.strip()]
+        # samples without rows would only blur the dtypes of the others
+        frames = [f for f in frames if len(f)] or frames[:1]
+        meta = _concat_frames(frames)[:0] if frames else pd.DataFrame()
+        if kwargs.get('parser', 'pandas') == 'pandas':
+            meta = _nullable(meta)
+        if compact:
+            meta = meta.astype({c: 'category' for c in self.CATEGORICAL
+                                if c in meta.columns})
+        if key is not None:
+            with self._lock:
+                self.schemas.pop(key, None)
+                self.schemas[key] = time.time(), meta
+                while len(self.schemas) > self.SCHEMA_MAX:
+                    # oldest first
+                    del self.schemas[next(iter(self.schemas))]
+        return meta
+
+    def get_dataframe_iter(self, sid, chunksize, offset=0, count=0,
+                           buffer_size=2**20, columns=None, compact=False,
+                           **kwargs):
+        """
+        Stream rows from completed query, yielding dataframes as they arrive
+
+        Memory use is bounded by ``chunksize`` rows plus ``buffer_size``
+        bytes, rather than by the size of the result. If the connection
+        breaks, the stream is reopened (up to ``.retries`` times in a row)
+        at the first row not yet yielded.
+
+        Parameters
+        ----------
+        sid: str
+            The job's ID
+        chunksize: int
+            Number of rows in each dataframe
+        offset: int
+            Starting row
+        count: int
+            Number of rows to fetch, 0 for all
+        buffer_size: int
+            Bytes to read from the socket at a time
+        columns: list of str or None
+            Fields to fetch, as for get_dataframe
+        compact: bool
+            Make the ``CATEGORICAL`` fields categorical, with categories
+            shared by all chunks (see ``_compact``), and shrink numeric
+            columns where no value changes. Each chunk is
+            downcast separately, so numeric dtypes may differ between them.
         kwargs: passed to pd.read_csv
         """
-        txt = self.get_query_result(sid, offset, count)
-        return pd.read_csv(io.BytesIO(txt), **kwargs)
+        done = 0
+        attempt = 0
+        # shared by the chunks of this read, even outside a read call
+        categories = _categories.get()
+        if categories is None:
+            categories = {}
+        while not count or done < count:
+            try:
+                with self.get_query_stream(
+                        sid, offset + done, count - done if count else 0,
+                        buffer_size, columns=columns) as f:
+                    for df in self._timed(_iter_csv(f, chunksize, **kwargs),
+                                          'results', f):
+                        done += len(df)
+                        attempt = 0
+                        yield (self._compact(df, categories=categories)
+                               if compact else df)
+                return
+            except _transient():
+                if attempt >= self.retries:
+                    raise
+                time.sleep(self._retry_wait(attempt))
+                attempt += 1
+
+    def _dispatch(self, q, earliest=None, latest=None, sid=None):
+        """
+        SID of the job to read: the one given, a live one for the same
+        query from the job registry, or a newly started one
+        """
+        if sid is not None:
+            return sid
+        if q is None:
+            raise ValueError('Must supply a query or a job SID')
+        if self.jobs is None:
+            return self.start_query(q, earliest, latest)
+        key = self.jobs.key(self._sanitize_query(q), earliest, latest)
+        sid = self.jobs.get(key)
+        if sid is None:
+            sid = self.start_query(q, earliest, latest)
+            self.jobs.put(key, sid)
+        return sid
+
+    def _start_jobs(self, q, earliest=None, latest=None, sid=None,
+                    partition=None):
+        """
+        Dispatch (or attach to) the jobs for a read and wait for them all
+
+        Without ``partition`` this is one job. With it, the time range is
+        split into slices (see ``_time_slices``), each searched by its own
+        job, up to ``MAX_JOBS`` at once, so that Splunk runs them on
+        separate search pipelines.
 
-    def read_pandas(self, q, **kwargs):
+        Returns list of (sid, result count), in time order of the slices
+        """
+        if partition is None:
+            sid = self._dispatch(q, earliest, latest, sid)
+            return [(sid, self.wait_poll(sid)[1])]
+        if sid is not None:
+            raise ValueError('Cannot partition an existing job by time')
+        slices = _time_slices(earliest, latest, partition)
+
+        def run(bounds):
+            sid = self._dispatch(q, *bounds)
+            return sid, self.wait_poll(sid)[1]
+
+        with ThreadPoolExecutor(min(len(slices), self.MAX_JOBS)) as ex:
+            return list(ex.map(_in_context(run), slices))
+
+    def _cache_key(self, q, earliest, latest, kwargs, partition=None):
+        if self.cache is None or q is None or kwargs.get('as_table'):
+            return None
+        if partition is not None:
+            kwargs = dict(kwargs, partition=partition)
+        return self.cache.key(self._sanitize_query(q), earliest, latest,
+                              **kwargs)
+
+    @staticmethod
+    def _parquet_kwargs(kwargs):
+        # keep Arrow-backed columns Arrow-backed on the way back from disk
+        if kwargs.get('parser') == 'arrow':
+            return {'dtype_backend': 'pyarrow'}
+        return {}
+
+    @_reported
+    def read_pandas(self, q=None, parallel=None, chunksize=None, earliest=None,
+                    latest=None, sid=None, partition=None, filters=None,
+                    **kwargs):
         """
         Start query, wait for completion and download data as a dataframe
 
         Parameters
         ----------
         q: str
-            Valid Splunk query
-        kwargs: passed to pd.read_csv
+            Valid Splunk query; may be None if ``sid`` is given
+        parallel: int or None
+            If given, download in chunks on this many threads and concatenate
+            them in order; otherwise fetch the whole result in one request.
+            Keep ``pool_maxsize`` at least this large so that connections
+            are reused. Chunks are parsed to dtypes inferred from samples
+            (see ``infer_meta``), so integer and boolean columns come out
+            as pandas' nullable ``Int64`` and ``boolean``, rather than the
+            ``int64`` and ``bool`` of a single request; as they also do
+            with ``partition``.
+        chunksize: int or None
+            Number of rows in each chunk, when ``parallel`` is set. Default
+            is to split the result evenly between the threads.
+        earliest, latest: str, float or None
+            Time range to search, passed to ``start_query``
+        sid: str or None
+            Read the results of this existing job instead of starting one
+        partition: str, timedelta or None
+            Split [earliest, latest) into slices of this length (e.g.,
+            ``'1h'``) and search each with its own job, concurrently. The
+            bounds must then be absolute times.
+        filters: list of tuples or None
+            Row conditions such as ``[('status', '>=', 500)]``, appended to
+            ``q`` as a ``| where`` clause so that Splunk drops other rows
+            before sending them (see ``_filter_clause``)
+        kwargs: passed to get_dataframe (e.g., ``parser='arrow'``,
+            ``columns=``) and from there to the CSV parser
         """
-        sid = self.start_query(q)
-        self.wait_poll(sid)
-        return self.get_dataframe(sid, **kwargs)
+        q = self._filter_query(q, filters)
+        key = self._cache_key(q, earliest, latest, kwargs, partition)
+        if key is not None:
+            df = self.cache.load(key, **self._parquet_kwargs(kwargs))
+            if df is not None:
+                return df
+        jobs = self._start_jobs(q, earliest, latest, sid, partition)
+        if (parallel or len(jobs) > 1) and not kwargs.get('as_table'):
+            # chunks parsed separately must agree on dtypes
+            kwargs['meta'] = self.infer_meta(
+                jobs, key=self._schema_key(q, earliest, latest, sid, partition,
+                                           kwargs), **kwargs)
+        if len(jobs) == 1:
+            df = self._download(jobs[0][0], jobs[0][1], parallel, chunksize,
+                                **kwargs)
+        else:
+            with ThreadPoolExecutor(min(len(jobs), self.MAX_JOBS)) as ex:
+                parts = list(ex.map(_in_context(
+                    lambda job: self._download(job[0], job[1], parallel,
+                                               chunksize, **kwargs)),
+                    [job for job in jobs if job[1]] or jobs[:1]))
+            df = self._concat(parts, kwargs)
+        if kwargs.get('compact') and 'meta' in kwargs:
+            # parts were parsed to shared dtypes; shrink the whole
+            df = _downcast(df)
+        if key is not None:
+            self.cache.put(key, df)
+        return df
+
+    def _schema_key(self, q, earliest, latest, sid, partition, kwargs):
+        if q is None:
+            return sid, repr(sorted(kwargs.items()))
+        return (self._sanitize_query(q), earliest, latest, partition,
+                repr(sorted(kwargs.items())))
 
-    def read_pandas_iter(self, q, chunksize, **kwargs):
+    def _download(self, sid, count, parallel=None, chunksize=None, **kwargs):
+        """
+        Fetch all rows of a finished job into one dataframe or table
+        """
+        if not parallel or not count:
+            return self.get_dataframe(sid, **kwargs)
+        chunksize = chunksize or -(-count // parallel)
+        with ThreadPoolExecutor(parallel) as ex:
+            parts = list(ex.map(_in_context(
+                lambda i: self.get_dataframe(sid, offset=i, count=chunksize,
+                                             **kwargs)),
+                range(0, count, chunksize)))
+        return self._concat(parts, kwargs)
+
+    @staticmethod
+    def _concat(parts, kwargs):
+        if kwargs.get('as_table'):
+            import pyarrow
+            return pyarrow.concat_tables(parts)
+        return _concat_frames(_unify_categories(parts))
+
+    @_reported
+    def read_pandas_iter(self, q, chunksize, pipeline=False, earliest=None,
+                         latest=None, sid=None, filters=None, **kwargs):
         """
         Start query, wait for completion and make an iterator of dataframes
 
         Parameters
         ----------
         q: str
-            Valid Splunk query
+            Valid Splunk query; may be None if ``sid`` is given
         chunksize: int
             Number of rows in each dataframe
-        kwargs: passed to pd.read_csv
+        pipeline: bool
+            If True, don't wait for completion: fetch each chunk as soon as
+            the job reports enough results for it (see ``pipeline_iter``)
+        earliest, latest: str, float or None
+            Time range to search, passed to ``start_query``
+        sid: str or None
+            Read the results of this existing job instead of starting one
+        filters: list of tuples or None
+            Row conditions such as ``[('status', '>=', 500)]``, appended to
+            ``q`` as a ``| where`` clause so that Splunk drops other rows
+            before sending them (see ``_filter_clause``)
+        kwargs: passed to get_dataframe (e.g., ``parser='arrow'``,
+            ``columns=``) and from there to the CSV parser
         """
-        sid = self.start_query(q)
+        q = self._filter_query(q, filters)
+        sid = self._dispatch(q, earliest, latest, sid)
+        if pipeline:
+            yield from self.pipeline_iter(sid, chunksize, **kwargs)
+            return
         done, count = self.wait_poll(sid)
         for i in range(0, count, chunksize):
             yield self.get_dataframe(sid, offset=i, count=chunksize, **kwargs)
 
-    def read_dask(self, q, chunksize, **kwargs):
+    def pipeline_iter(self, sid, chunksize, **kwargs):
         """
-        Start query, wait for completion, return lazy dask dataframe.
+        Download chunks of a job's results while it is still running
+
+        On each poll, every complete chunk of ``chunksize`` rows that the
+        job reports is fetched from the preview endpoint; once the job is
+        done, the remainder is drained from the final results. Only
+        suitable for searches whose earlier results do not change as the
+        search progresses, i.e., non-transforming searches.
+
+        Parameters
+        ----------
+        sid: str
+            The job's ID
+        chunksize: int
+            Number of rows in each dataframe
+        kwargs: passed to get_dataframe
+        """
+        sched = self._scheduler()
+        offset = 0
+        while True:
+            status = self.poll_status(sid)
+            done = status['isDone']
+            if done:
+                count = status.get('resultCount', 0)
+            else:
+                count = status.get('resultPreviewCount',
+                                   status.get('resultCount', 0))
+            while offset + chunksize <= count or (done and offset < count):
+                yield self.get_dataframe(sid, offset=offset, count=chunksize,
+                                         preview=not done, **kwargs)
+                offset += chunksize
+            if done:
+                self._record_poll(sid, sched.done(status))
+                # the wait overlapped downloading, so says nothing of queueing
+                self._job_done(sid, status)
+                return
+            if time.time() - sched.time0 > self.TIMEOUT:
+                raise RuntimeError("Timeout waiting for Splunk to finish query")
+            wait = sched.next_wait(status)
+            duration = float(status.get('runDuration', 0))
+            if count and duration:
+                # poll again when the next chunk should be ready
+                ready = (offset + chunksize - count) * duration / count
+                wait = min(wait, max(ready, sched.minimum))
+            time.sleep(wait)
 
-        This does download the first 20 rows in this thread, to infer dtypes.
+    @_reported
+    def read_pandas_stream(self, q, chunksize, buffer_size=2**20,
+                           earliest=None, latest=None, sid=None, filters=None,
+                           **kwargs):
+        """
+        Start query, wait for completion and stream the whole result in one
+        request, yielding dataframes as bytes arrive
+
+        Unlike ``read_pandas_iter``, there is one request in total rather
+        than one per chunk; dtypes are inferred separately for each chunk,
+        so pass ``dtype=`` if they must agree.
+
+        Parameters
+        ----------
+        q: str
+            Valid Splunk query; may be None if ``sid`` is given
+        chunksize: int
+            Number of rows in each dataframe
+        buffer_size: int
+            Bytes to read from the socket at a time
+        earliest, latest: str, float or None
+            Time range to search, passed to ``start_query``
+        sid: str or None
+            Read the results of this existing job instead of starting one
+        filters: list of tuples or None
+            Row conditions such as ``[('status', '>=', 500)]``, appended to
+            ``q`` as a ``| where`` clause so that Splunk drops other rows
+            before sending them (see ``_filter_clause``)
+        kwargs: passed to get_dataframe_iter (e.g., ``columns=``) and from
+            there to pd.read_csv
+        """
+        q = self._filter_query(q, filters)
+        sid = self._dispatch(q, earliest, latest, sid)
+        self.wait_poll(sid)
+        return self.get_dataframe_iter(sid, chunksize, buffer_size=buffer_size,
+                                       **kwargs)
+
+    @_reported
+    def read_pandas_export(self, q, chunksize, buffer_size=2**20, columns=None,
+                           filters=None, compact=False, **kwargs):
+        """
+        Stream query results from the export endpoint, yielding dataframes
+        while the search is still running
+
+        There is no job dispatch or completion wait, so the first rows
+        arrive as soon as Splunk produces them. Best suited to
+        non-transforming searches, whose events stream out incrementally;
+        dtypes are inferred separately for each chunk. Nor is there a job
+        to resume from, so a connection broken mid-stream raises.
 
         Parameters
         ----------
@@ -177,14 +1577,145 @@ class SplunkConnect:
             Valid Splunk query
         chunksize: int
             Number of rows in each dataframe
+        buffer_size: int
+            Bytes to read from the socket at a time
+        columns: list of str or None
+            Fields to fetch, via a ``| fields`` clause appended to ``q``
+        filters: list of tuples or None
+            Row conditions such as ``[('status', '>=', 500)]``, appended to
+            ``q`` as a ``| where`` clause so that Splunk drops other rows
+            before sending them (see ``_filter_clause``)
+        compact: bool
+            Shrink each chunk's memory, as for ``get_dataframe_iter``
         kwargs: passed to pd.read_csv
         """
+        q = self._filter_query(q, filters)
+        with self.export_stream(q, buffer_size, columns=columns) as f:
+            for df in self._timed(_iter_csv(f, chunksize, **kwargs),
+                                  'export', f):
+                yield self._compact(df) if compact else df
+
+    @_reported
+    def read_dask(self, q, chunksize, earliest=None, latest=None, sid=None,
+                  partition=None, divisions=False, filters=None, **kwargs):
+        """
+        Start query, wait for completion, return lazy dask dataframe.
+
+        This does download a few small samples spread through the result in
+        this thread, to infer dtypes (see ``infer_meta``); every partition
+        is then parsed to those dtypes.
+
+        With a ``cache``, a stored result is read back from Parquet without
+        contacting Splunk; otherwise each partition is written to the cache
+        as it is computed.
+
+        Parameters
+        ----------
+        q: str
+            Valid Splunk query; may be None if ``sid`` is given
+        chunksize: int
+            Number of rows in each dataframe
+        earliest, latest: str, float or None
+            Time range to search, passed to ``start_query``
+        sid: str or None
+            Read the results of this existing job instead of starting one
+        partition: str, timedelta or None
+            Split [earliest, latest) into slices of this length (e.g.,
+            ``'1h'``) and search each with its own job, concurrently;
+            each job's results become separate partitions. The
+            bounds must then be absolute times.
+        divisions: bool
+            If True (requires ``partition``), make one partition per time
+            slice, indexed and sorted by ``_time`` (as UTC datetimes), with
+            the slice boundaries as known divisions, so that selecting by
+            time only touches the partitions needed. ``chunksize`` then sets
+            the size of each request within a slice. Not cached.
+        filters: list of tuples or None
+            Row conditions such as ``[('status', '>=', 500)]``, appended to
+            ``q`` as a ``| where`` clause so that Splunk drops other rows
+            before sending them (see ``_filter_clause``)
+        kwargs: passed to get_dataframe (e.g., ``parser='arrow'``,
+            ``columns=``) and from there to the CSV parser
+        """
+        import pandas as pd
         from dask import delayed
         import dask.dataframe as dd
-        sid = self.start_query(q)
-        done, count = self.wait_poll(sid)
-        meta = self.get_dataframe(sid, count=20)[:0]
-        parts = [delayed(self.get_dataframe)(sid, offset=i, count=chunksize,
-                                             **kwargs)
-                 for i in range(0, count, chunksize)]
+        if kwargs.get('as_table'):
+            raise ValueError('read_dask produces dataframes, not arrow tables')
+        q = self._filter_query(q, filters)
+        if divisions:
+            if partition is None:
+                raise ValueError('divisions=True needs partition= to define '
+                                 'the time slices')
+            if sid is not None:
+                raise ValueError('Cannot partition an existing job by time')
+            return self._read_dask_divisions(q, chunksize, earliest, latest,
+                                             partition, **kwargs)
+        key = self._cache_key(q, earliest, latest, kwargs, partition)
+        if key is not None:
+            paths = self.cache.get(key)
+            if paths:
+                pq_kwargs = self._parquet_kwargs(kwargs)
+                parts = [delayed(pd.read_parquet)(p, **pq_kwargs)
+                         for p in paths]
+                meta = pd.read_parquet(paths[0], **pq_kwargs)[:0]
+                return dd.from_delayed(parts, meta=meta)
+        jobs = self._start_jobs(q, earliest, latest, sid, partition)
+        chunks = [(sid, i) for sid, count in jobs
+                  for i in range(0, count, chunksize)]
+        kwargs['meta'] = self.infer_meta(
+            jobs, key=self._schema_key(q, earliest, latest, sid, partition,
+                                       kwargs), **kwargs)
+        meta = _dask_meta(kwargs['meta'])
+        if not chunks:
+            return dd.from_pandas(kwargs['meta'], npartitions=1)
+        # partitions are computed later, but share this call's categories
+        if key is not None:
+            staging = self.cache.begin(key, len(chunks))
+            get = delayed(_sharing_categories(self._get_cached_part))
+            parts = [get(staging, j, sid, offset=i, count=chunksize, **kwargs)
+                     for j, (sid, i) in enumerate(chunks)]
+        else:
+            get = delayed(_sharing_categories(self.get_dataframe))
+            parts = [get(sid, offset=i, count=chunksize, **kwargs)
+                     for sid, i in chunks]
         return dd.from_delayed(parts, meta=meta)
+
+    def _get_cached_part(self, staging, i, sid, offset, count, **kwargs):
+        df = self.get_dataframe(sid, offset=offset, count=count, **kwargs)
+        self.cache.put_part(staging, i, df)
+        return df
+
+    def _read_dask_divisions(self, q, chunksize, earliest, latest, partition,
+                             **kwargs):
+        import pandas as pd
+        from dask import delayed
+        import dask.dataframe as dd
+        slices = _time_slices(earliest, latest, partition)
+        columns = kwargs.get('columns')
+        if columns is not None and '_time' not in columns:
+            kwargs['columns'] = ['_time'] + list(columns)
+        jobs = self._start_jobs(q, earliest, latest, partition=partition)
+        kwargs['meta'] = self.infer_meta(
+            jobs, key=self._schema_key(q, earliest, latest, None, partition,
+                                       kwargs), **kwargs)
+        if '_time' not in kwargs['meta']:
+            raise ValueError('divisions=True needs a _time field in the '
+                             'results, to index them by')
+        meta = _dask_meta(_time_index(kwargs['meta']))
+        get = delayed(_sharing_categories(self._get_time_part))
+        parts = [get(sid, count, chunksize, **kwargs) for sid, count in jobs]
+        divs = [pd.Timestamp(start, unit='s', tz='UTC').as_unit('ns')
+                for start, end in slices]
+        divs.append(pd.Timestamp(slices[-1][1], unit='s', tz='UTC').as_unit('ns'))
+        return dd.from_delayed(parts, meta=meta, divisions=divs)
+
+    def _get_time_part(self, sid, count, chunksize, meta, **kwargs):
+        """
+        All of one time slice's results, indexed and sorted by time
+        """
+        parts = [self.get_dataframe(sid, offset=i, count=chunksize, meta=meta,
+                                    **kwargs)
+                 for i in range(0, count, chunksize)]
+        df = self._concat(parts, kwargs) if parts else meta.copy()
+        return _time_index(df).sort_index()
@@ -0,0 +1,195 @@
+"""
+Collect and summarize the events reported by ``SplunkConnect`` hooks
+"""
+import threading
+
+FIELDS = ['kind', 'name', 'url', 'method', 'status', 'retries', 'seconds',
+          'bytes', 'rows', 'error']
+
+
+class Metrics:
+
+    """
+    Record every event of a connector, and report percentiles and rates
+
+    A hook is any callable taking one event, a dict with keys:
+
+    - kind: 'request' (one REST call, including its retries), 'read' (the
+      body of a streamed response, reported when closed), 'decompress'
+      (decoding a compressed body, within its request's time) or 'parse'
+      (turning a payload into a dataframe or table)
+    - name: what the call was for: 'auth', 'saved_searches', 'dispatch',
+      'status', 'results', 'results_preview' or 'export'
+    - url: the search head, for requests and reads
+    - method, status: HTTP method and final status code, for requests
+    - retries: attempts beyond the first, for requests
+    - seconds: wall time taken; for reads, the time spent waiting on the
+      socket
+    - bytes: as sent on the wire (compressed, if so) for requests and
+      reads; as parsed for parse events
+    - rows: rows produced, for parse events
+    - error: the exception raised, if any
+
+    Keys that do not apply are None. This class is such a hook; pass it
+    as ``SplunkConnect(..., hooks=[Metrics()])``, or write your own to
+    forward events to a metrics system.
+    """
+
+    def __init__(self):
+        self.events = []
+        self._lock = threading.Lock()
+
+    def __call__(self, event):
+        with self._lock:
+            self.events.append(event)
+
+    def __getstate__(self):
+        return {'events': self.events}
+
+    def __setstate__(self, state):
+        self.__init__()
+        self.events = state['events']
+
+    def clear(self):
+        with self._lock:
+            self.events = []
+
+    def to_frame(self):
+        """
+        All events so far, one row each
+        """
+        import pandas as pd
+        with self._lock:
+            events = list(self.events)
+        return pd.DataFrame(events, columns=FIELDS)
+
+    def summary(self, by=('kind', 'name')):
+        """
+        Per-group counts, latency percentiles (seconds) and throughput
+
+        Parameters
+        ----------
+        by: list of str
+            Event fields to group by; add ``'url'`` to compare search heads
+
+        Returns a dataframe with columns count, errors, retries, p50, p95,
+        p99, seconds (total), bytes, rows, rows/s and MB/s; the rates are
+        totals over the time spent in the calls themselves.
+        """
+        df = self.to_frame()
+        g = df.groupby(list(by), dropna=False)
+        out = g.agg(count=('seconds', 'size'),
+                    errors=('error', 'count'),
+                    retries=('retries', 'sum'),
+                    seconds=('seconds', 'sum'),
+                    bytes=('bytes', 'sum'),
+                    rows=('rows', 'sum'))
+        q = g['seconds'].quantile([0.5, 0.95, 0.99]).unstack()
+        q.columns = ['p50', 'p95', 'p99']
+        out = out.join(q)
+        out['rows/s'] = out['rows'] / out['seconds']
+        out['MB/s'] = out['bytes'] / out['seconds'] / 2**20
+        return out[['count', 'errors', 'retries', 'p50', 'p95', 'p99',
+                    'seconds', 'bytes', 'rows', 'rows/s', 'MB/s']]
+
+    def report(self, by=('kind', 'name')):
+        """
+        ``summary`` as printable text
+        """
+        return self.summary(by).to_string(float_format='%.4g')
+
+
+class QueryReport:
+
+    """
+    Where the time of one ``read_*`` call went
+
+    Filled in from the events of the call (as given to hooks) and from its
+    jobs' final status. Phases run concurrently on several threads are
+    summed, so together they may exceed ``wall``.
+
+    ``as_dict()`` gives, in seconds unless noted:
+
+    - wall: time spent in the call (for iterators, excluding the time the
+      consumer spends between chunks)
+    - dispatch: starting the search jobs
+    - queue: waiting for jobs beyond their own run time, i.e., queueing
+      on the server plus polling lag
+    - run: the jobs' ``runDuration``, as reported by Splunk
+    - download: receiving result bodies
+    - decompress: decoding compressed bodies (for streamed bodies, this is
+      done while reading and counted in download instead)
+    - parse: turning CSV into dataframes or tables
+    - requests, retries: REST calls made, and their retries
+    - bytes: received on the wire; rows: produced
+    - scanCount, eventCount, resultCount: Splunk's job statistics, summed
+      over jobs
+    - sids: the jobs read
+    """
+
+    PHASES = ['wall', 'dispatch', 'queue', 'run', 'download', 'decompress',
+              'parse']
+
+    def __init__(self):
+        self.totals = dict.fromkeys(self.PHASES, 0.0)
+        self.totals.update(requests=0, retries=0, bytes=0, rows=0,
+                           scanCount=0, eventCount=0, resultCount=0)
+        self.sids = []
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        return {'totals': self.totals, 'sids': self.sids}
+
+    def __setstate__(self, state):
+        self.__init__()
+        self.totals, self.sids = state['totals'], state['sids']
+
+    def add(self, event):
+        """
+        Account for one event
+        """
+        kind, name, seconds = event['kind'], event['name'], event['seconds']
+        with self._lock:
+            t = self.totals
+            if kind == 'request':
+                t['requests'] += 1
+                t['retries'] += event['retries'] or 0
+                t['bytes'] += event['bytes'] or 0
+                if name == 'dispatch':
+                    t['dispatch'] += seconds
+                elif name in ('results', 'results_preview', 'export'):
+                    t['download'] += seconds
+            elif kind == 'read':
+                t['bytes'] += event['bytes'] or 0
+                t['download'] += seconds
+            elif kind == 'decompress':
+                # decoding happened within the request's time
+                t['decompress'] += seconds
+                t['download'] -= seconds
+            elif kind == 'parse':
+                t['rows'] += event['rows'] or 0
+                t['parse'] += seconds
+
+    def job(self, sid, status, waited=None):
+        """
+        Account for a finished job, given its status and the time spent
+        waiting for it, if known
+        """
+        run = float(status.get('runDuration', 0))
+        with self._lock:
+            t = self.totals
+            t['run'] += run
+            if waited is not None:
+                t['queue'] += max(0, waited - run)
+            for k in ('scanCount', 'eventCount', 'resultCount'):
+                t[k] += int(status.get(k, 0) or 0)
+            self.sids.append(sid)
+
+    def as_dict(self):
+        with self._lock:
+            return dict(self.totals, sids=list(self.sids))
+
+    def __repr__(self):
+        d = self.as_dict()
+        return '<QueryReport %s>' % ', '.join(
+            '%s=%.3f' % (k, d[k]) for k in self.PHASES)
@@ -0,0 +1,519 @@
+"""
+In-process stand-in for the Splunk REST API, for offline tests and benchmarks
+
+Only the endpoints used by ``SplunkConnect`` are implemented, with enough
+fidelity to exercise polling, paging and parallel download against a real
+socket on the local machine.
+"""
+import http.server
+import json
+import random
+import re
+import socket
+import threading
+import time
+import uuid
+import zlib
+from urllib.parse import urlparse, parse_qs
+
+
+def make_data(nrows=1000, ncols=4, seed=0):
+    """
+    Make a dataframe that looks like typical Splunk search output
+
+    Parameters
+    ----------
+    nrows: int
+        Number of rows (events)
+    ncols: int
+        Number of extra numerical fields, in addition to ``_time`` and the
+        usual metadata fields
+    seed: int
+        For the random number generator
+    """
+    import numpy as np
+    import pandas as pd
+    rng = np.random.default_rng(seed)
+    out = pd.DataFrame({
+        '_time': pd.date_range('2020-01-01', periods=nrows, freq='s',
+                               tz='UTC').strftime('%Y-%m-%dT%H:%M:%S.000+00:00'),
+        'host': rng.choice(['web-%02i' % i for i in range(20)], nrows),
+        'source': rng.choice(['/var/log/access.log', '/var/log/error.log'],
+                             nrows),
+        'sourcetype': rng.choice(['access_combined', 'apache_error'], nrows),
+        'index': 'main',
+        'splunk_server': rng.choice(['idx1', 'idx2', 'idx3'], nrows),
+    })
+    for i in range(ncols):
+        out['field%i' % i] = rng.integers(0, 1000, nrows)
+    return out
+
+
+def _timestamp(t):
+    import pandas as pd
+    try:
+        return pd.Timestamp(float(t), unit='s', tz='UTC')
+    except ValueError:
+        t = pd.Timestamp(t)
+        return t if t.tzinfo else t.tz_localize('UTC')
+
+
+def _apply_pipes(q, data):
+    """
+    Apply the ``| where`` and ``| fields`` clauses of the query, if any
+
+    Only the forms generated by ``SplunkConnect`` (``filters=`` and
+    ``columns=``) are understood.
+    """
+    for cmd in re.split(r'\|(?=(?:[^"]*"[^"]*")*[^"]*$)', q)[1:]:
+        cmd = cmd.strip()
+        if cmd.startswith('fields '):
+            names = [n.strip('"') for n in
+                     re.findall(r'"[^"]*"|[^\s,]+', cmd[7:])]
+            data = data[[n for n in names if n in data]]
+        elif cmd.startswith('where '):
+            data = data[_where(cmd[6:], data)].reset_index(drop=True)
+    return data
+
+
+def _where(expr, data):
+    """
+    Boolean mask for an SPL ``where`` expression, via ``DataFrame.eval``
+    """
+    expr = re.sub(r"'((?:[^'\\]|\\.)*)'", r'`\1`', expr)
+    expr = re.sub(r'\bin\(([^,]+), ([^)]*)\)', r'\1.isin([\2])', expr)
+    expr = re.sub(r'\bisnull\(([^)]+)\)', r'\1.isnull()', expr)
+    expr = re.sub(r'\bisnotnull\(([^)]+)\)', r'\1.notnull()', expr)
+    expr = (expr.replace(' AND ', ' & ').replace(' OR ', ' | ')
+            .replace('NOT ', '~').replace('false()', 'False')
+            .replace('true()', 'True'))
+    return data.eval(expr, engine='python').values
+
+
+class MockSplunk:
+    """
+    Serve a fake Splunk REST API from a background thread
+
+    Use as a context manager, or call ``start()``/``stop()``; the address to
+    give to ``SplunkConnect`` is ``.url``.
+
+    Parameters
+    ----------
+    data: pandas.DataFrame or callable
+        The results of every query, or a function taking the query text and
+        returning the results. If None, uses ``make_data(nrows)``.
+    nrows: int
+        Number of rows of generated data, if ``data`` is not given
+    latency: float
+        Seconds to wait before answering each request
+    bandwidth: float or None
+        Maximum bytes per second to send in each response body
+    run_time: float
+        Seconds each job takes to complete after dispatch; the export
+        endpoint spreads its output over the same time
+    error_rate: float
+        Fraction of requests to fail at random, with one of ``error_codes``
+    error_codes: list of int
+        HTTP status codes used for random failures
+    seed: int or None
+        For the error-injection random number generator
+    compress: bool
+        If True, compress response bodies with gzip or deflate when the
+        client's Accept-Encoding allows
+    capacity: int or None
+        Most requests handled at once; any more are refused with 503, as an
+        overloaded search head does
+    members: int
+        Number of servers to run, sharing jobs and data as the members of
+        a search head cluster do; their addresses are ``.urls``
+    saved: dict
+        Saved searches, name: query text
+    """
+
+    def __init__(self, data=None, nrows=1000, latency=0, bandwidth=None,
+                 run_time=0, error_rate=0, error_codes=(503,), seed=None,
+                 saved=None, compress=True, capacity=None, members=1,
+                 host='127.0.0.1', port=0):
+        if data is None:
+            data = make_data(nrows)
+        self.data = data
+        self.latency = latency
+        self.bandwidth = bandwidth
+        self.run_time = run_time
+        self.error_rate = error_rate
+        self.error_codes = list(error_codes)
+        self.saved = saved or {}
+        self.compress = compress
+        self.capacity = capacity
+        self.active = 0
+        self.address = (host, port)
+        self.members = members
+        self.jobs = {}
+        self.failures = []
+        self.cuts = []
+        self.stats = {'requests': 0, 'connections': 0, 'bytes_sent': 0,
+                      'refused': 0, 'peak_active': 0, 'by_member': {}}
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.server = None
+        self.servers = []
+
+    @property
+    def url(self):
+        return self.urls[0]
+
+    @property
+    def urls(self):
+        return ['http://%s:%i' % s.server_address[:2] for s in self.servers]
+
+    def start(self):
+        host, port = self.address
+        for i in range(self.members):
+            server = _Server((host, port + i if port else 0), _Handler)
+            server.mock = self
+            threading.Thread(target=server.serve_forever, args=(0.05, ),
+                             daemon=True).start()
+            self.servers.append(server)
+        self.server = self.servers[0]
+        return self
+
+    def stop(self):
+        for server in self.servers:
+            self.stop_member(server)
+        self.servers = []
+
+    def stop_member(self, server):
+        """
+        Shut down one member (a server from ``.servers``), as if it failed
+        """
+        if server.socket.fileno() != -1:
+            server.shutdown()
+            server.server_close()
+            # and drop kept-alive connections, which would otherwise live on
+            for conn in list(server.conns):
+                try:
+                    conn.shutdown(socket.SHUT_RDWR)
+                except OSError:
+                    pass
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *args):
+        self.stop()
+
+    def fail_next(self, n=1, status=503):
+        """
+        Make the next ``n`` requests fail with the given HTTP status
+        """
+        with self._lock:
+            self.failures.extend([status] * n)
+
+    def cut_next(self, n=1, fraction=0.5):
+        """
+        Make the next ``n`` result downloads drop the connection after
+        sending ``fraction`` of the body
+        """
+        with self._lock:
+            self.cuts.extend([fraction] * n)
+
+    def _injected_cut(self):
+        with self._lock:
+            if self.cuts:
+                return self.cuts.pop(0)
+
+    def _injected_error(self):
+        with self._lock:
+            if self.failures:
+                return self.failures.pop(0)
+        if self.error_rate and self._random.random() < self.error_rate:
+            return self._random.choice(self.error_codes)
+
+    def submit(self, q, earliest=None, latest=None):
+        """
+        Register a new job for query ``q``, returning its SID
+
+        Absolute ``earliest``/``latest`` (epoch seconds or ISO strings)
+        select rows by ``_time``, if the data has it; relative times are
+        ignored.
+        """
+        data = self.data(q) if callable(self.data) else self.data
+        data = _apply_pipes(q, data)
+        if '_time' in data and (earliest or latest):
+            import pandas as pd
+            t = pd.to_datetime(data['_time'], utc=True)
+            keep = pd.Series(True, index=data.index)
+            try:
+                if earliest:
+                    keep &= t >= _timestamp(earliest)
+                if latest:
+                    keep &= t < _timestamp(latest)
+            except ValueError:
+                pass
+            else:
+                data = data[keep.values].reset_index(drop=True)
+        sid = uuid.uuid4().hex
+        with self._lock:
+            self.jobs[sid] = {'search': q, 'data': data, 'start': time.time()}
+        return sid
+
+    def status(self, sid):
+        """
+        Job status content, as returned by ``/services/search/jobs/<sid>``
+        """
+        job = self.jobs[sid]
+        elapsed = time.time() - job['start']
+        n = len(job['data'])
+        progress = min(1, elapsed / self.run_time) if self.run_time else 1
+        done = progress >= 1
+        return {
+            'isDone': done,
+            'dispatchState': 'DONE' if done else 'RUNNING',
+            'doneProgress': progress,
+            'runDuration': min(elapsed, self.run_time),
+            'resultCount': n if done else int(n * progress),
+            'resultPreviewCount': n if done else int(n * progress),
+            'eventCount': n,
+            'scanCount': n,
+            'sid': sid,
+        }
+
+
+class _Server(http.server.ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128
+
+    def __init__(self, *args):
+        super().__init__(*args)
+        self.conns = set()
+
+    def handle_error(self, request, client_address):
+        # clients that stop reading early are expected, not errors
+        import sys
+        if not issubclass(sys.exc_info()[0], ConnectionError):
+            super().handle_error(request, client_address)
+
+
+class _Handler(http.server.BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+
+    @property
+    def mock(self):
+        return self.server.mock
+
+    def log_message(self, *args):
+        pass
+
+    def setup(self):
+        super().setup()
+        self.server.conns.add(self.connection)
+        with self.mock._lock:
+            self.mock.stats['connections'] += 1
+
+    def finish(self):
+        super().finish()
+        self.server.conns.discard(self.connection)
+
+    def _encoder(self):
+        """
+        Compressor for the body, per the client's Accept-Encoding, or None
+        """
+        if not self.mock.compress:
+            return None, None
+        accept = [e.split(';')[0].strip() for e in
+                  self.headers.get('Accept-Encoding', '').split(',')]
+        for encoding, wbits in [('gzip', 31), ('deflate', 15)]:
+            if encoding in accept:
+                return encoding, zlib.compressobj(wbits=wbits)
+        return None, None
+
+    def _send(self, status, body=b'', ctype='application/json', cut=None):
+        encoding, z = self._encoder() if body else (None, None)
+        if z is not None:
+            body = z.compress(body) + z.flush()
+        self.send_response(status)
+        self.send_header('Content-Type', ctype)
+        self.send_header('Content-Length', str(len(body)))
+        if encoding:
+            self.send_header('Content-Encoding', encoding)
+        if self.close_connection:
+            self.send_header('Connection', 'close')
+        self.end_headers()
+        if cut is not None:
+            self._write(body[:int(len(body) * cut)])
+            return self._drop()
+        self._write(body)
+
+    def _drop(self):
+        """
+        Break the connection, as a network failure would
+        """
+        self.wfile.flush()
+        self.close_connection = True
+        self.connection.shutdown(socket.SHUT_RDWR)
+
+    def _write(self, body):
+        mock = self.mock
+        size = max(1, int(mock.bandwidth / 100)) if mock.bandwidth else None
+        for i in range(0, len(body), size or max(len(body), 1)):
+            block = body[i:i + size] if size else body
+            # counted first, since the client may be done reading before
+            # this thread runs again
+            with mock._lock:
+                mock.stats['bytes_sent'] += len(block)
+            self.wfile.write(block)
+            if size:
+                time.sleep(len(block) / mock.bandwidth)
+
+    def _send_chunked(self, blocks, ctype='text/csv', cut=None):
+        """
+        Send a response of unknown length, as Splunk does for export
+        """
+        encoding, z = self._encoder()
+        self.send_response(200)
+        self.send_header('Content-Type', ctype)
+        self.send_header('Transfer-Encoding', 'chunked')
+        if encoding:
+            self.send_header('Content-Encoding', encoding)
+        if self.close_connection:
+            self.send_header('Connection', 'close')
+        self.end_headers()
+        blocks = list(blocks) if cut is not None else blocks
+        if cut is not None:
+            blocks = blocks[:int(len(blocks) * cut)]
+        for block in blocks:
+            if z is not None:
+                # flush each batch, so the client can decode it on arrival
+                block = z.compress(block) + z.flush(zlib.Z_SYNC_FLUSH)
+            if block:
+                self._write(b'%x\r\n%s\r\n' % (len(block), block))
+        if cut is not None:
+            return self._drop()
+        if z is not None:
+            block = z.flush()
+            self._write(b'%x\r\n%s\r\n' % (len(block), block))
+        self._write(b'0\r\n\r\n')
+
+    def _json(self, obj, status=200):
+        self._send(status, json.dumps(obj).encode())
+
+    def _handle(self, method):
+        mock = self.mock
+        port = self.server.server_address[1]
+        with mock._lock:
+            mock.stats['requests'] += 1
+            mock.stats['by_member'][port] = (
+                mock.stats['by_member'].get(port, 0) + 1)
+            mock.active += 1
+            mock.stats['peak_active'] = max(mock.stats['peak_active'],
+                                            mock.active)
+            refuse = mock.capacity is not None and mock.active > mock.capacity
+            if refuse:
+                mock.stats['refused'] += 1
+        try:
+            if refuse:
+                return self._json({'messages': []}, status=503)
+            return self._serve(method)
+        finally:
+            with mock._lock:
+                mock.active -= 1
+
+    def _serve(self, method):
+        mock = self.mock
+        if mock.latency:
+            time.sleep(mock.latency)
+        form = {}
+        if method == 'POST':
+            length = int(self.headers.get('Content-Length', 0))
+            form = parse_qs(self.rfile.read(length).decode())
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        parts = url.path.strip('/').split('/')
+        if parts[:3] == ['services', 'auth', 'login']:
+            if not form.get('username'):
+                return self._json({'messages': []}, status=400)
+            return self._json({'sessionKey': uuid.uuid4().hex})
+        if 'Authorization' not in self.headers:
+            return self._json({'messages': [{'type': 'WARN', 'text':
+                                             'call not properly authenticated'}
+                                            ]}, status=401)
+        status = mock._injected_error()
+        if status:
+            return self._json({'messages': []}, status=status)
+        if parts[:4] == ['services', 'server', 'health', 'splunkd']:
+            return self._json({'entry': [{'name': 'splunkd', 'content': {
+                'health': 'green'}}]})
+        if parts[:3] == ['services', 'saved', 'searches']:
+            return self._json({'entry': [
+                {'name': k, 'content': {'search': v}}
+                for k, v in mock.saved.items()]})
+        if parts[:3] != ['services', 'search', 'jobs']:
+            return self._json({'messages': []}, status=404)
+        if len(parts) == 3 and method == 'POST':
+            sid = mock.submit(form['search'][0],
+                              form.get('earliest_time', [None])[0],
+                              form.get('latest_time', [None])[0])
+            return self._json({'sid': sid}, status=201)
+        if parts[3:] == ['export']:
+            return self._export(form)
+        sid = parts[3] if len(parts) > 3 else None
+        if sid not in mock.jobs:
+            return self._json({'messages': []}, status=404)
+        if len(parts) == 4:
+            return self._json({'entry': [{'name': sid,
+                                          'content': mock.status(sid)}]})
+        if parts[4] in ('results', 'results_preview'):
+            return self._results(sid, query, preview=parts[4] != 'results')
+        return self._json({'messages': []}, status=404)
+
+    def _results(self, sid, query, preview=False):
+        mock = self.mock
+        status = mock.status(sid)
+        if not status['isDone'] and not preview:
+            return self._send(204)
+        data = mock.jobs[sid]['data'].iloc[:status['resultPreviewCount']]
+        offset = int(query.get('offset', ['0'])[0])
+        count = int(query.get('count', ['100'])[0])
+        part = data.iloc[offset:offset + count] if count else data.iloc[offset:]
+        if 'f' in query:
+            part = part[[f for f in query['f'] if f in part]]
+        mode = query.get('output_mode', ['xml'])[0]
+        if mode == 'csv':
+            return self._send(200, part.to_csv(index=False).encode(),
+                              ctype='text/csv', cut=mock._injected_cut())
+        if mode == 'json':
+            body = ('{"preview": false, "init_offset": %i, "messages": [], '
+                    '"fields": %s, "results": %s}' % (
+                        offset, json.dumps([{'name': c} for c in part.columns]),
+                        part.to_json(orient='records')))
+            return self._send(200, body.encode())
+        return self._json({'messages': []}, status=400)
+
+    def _export(self, form):
+        """
+        Stream results in batches spread over the job's run time
+        """
+        mock = self.mock
+        if form.get('output_mode', ['xml'])[0] != 'csv':
+            return self._json({'messages': []}, status=400)
+        q = form['search'][0]
+        data = _apply_pipes(q, mock.data(q) if callable(mock.data)
+                              else mock.data)
+        nbatches = 10
+
+        def blocks():
+            step = -(-len(data) // nbatches) or 1
+            for i in range(0, max(len(data), 1), step):
+                if mock.run_time:
+                    time.sleep(mock.run_time / nbatches)
+                yield data.iloc[i:i + step].to_csv(index=False,
+                                                   header=i == 0).encode()
+
+        return self._send_chunked(blocks(), cut=mock._injected_cut())
+
+    def do_GET(self):
+        self._handle('GET')
+
+    def do_POST(self):
+        self._handle('POST')
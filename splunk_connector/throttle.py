@@ -0,0 +1,148 @@
+"""
+Client-side limits on the load put on one search head
+"""
+import threading
+import time
+import uuid
+import weakref
+
+# live throttles in this process, so that unpickled copies share state
+_live = weakref.WeakValueDictionary()
+_live_lock = threading.Lock()
+
+
+def _shared(token, state):
+    with _live_lock:
+        throttle = _live.get(token)
+        if throttle is None:
+            throttle = Throttle(**state)
+            throttle.token = token
+            _live[token] = throttle
+        return throttle
+
+
+class Throttle:
+
+    """
+    Limit the requests in flight and the bytes per second to a search head
+
+    The in-flight limit adapts as TCP's congestion window does: a 429 or
+    503 response halves it (at most once per round of requests, down to
+    ``min_inflight``) and holds back new requests for the server's
+    Retry-After, if given; every other success raises it by ``1/limit``,
+    i.e., by about one per round, back up to ``max_inflight``. So the
+    client settles just below the rate at which the server starts
+    refusing.
+
+    Bytes are metered by a token bucket refilled at ``bytes_per_second``:
+    each response spends its size on the wire, and while the bucket is in
+    debt, readers sleep and no new request starts.
+
+    Pass one instance as ``SplunkConnect(..., throttle=)`` to every
+    connector for the same search head. Copies made by pickling (e.g., for
+    dask workers) share state with all other copies in the same process,
+    so a cluster of N worker processes may together reach N times the
+    limits; divide them accordingly.
+
+    Parameters
+    ----------
+    max_inflight: int
+        Most requests in progress at once
+    bytes_per_second: float or None
+        Sustained download rate; None for no limit
+    min_inflight: int
+        Floor for the adaptive in-flight limit
+    burst: float or None
+        Bucket size in bytes, i.e., how far ahead of the rate a download
+        may run; default one second's worth
+    """
+
+    def __init__(self, max_inflight=8, bytes_per_second=None, min_inflight=1,
+                 burst=None):
+        self.max_inflight = max_inflight
+        self.min_inflight = min_inflight
+        self.bytes_per_second = bytes_per_second
+        self.burst = burst or bytes_per_second or 0
+        self.limit = float(max_inflight)
+        self.inflight = 0
+        self.tokens = self.burst
+        self.throttled = 0
+        self.token = uuid.uuid4().hex
+        self._stamp = time.monotonic()
+        self._paused_until = 0
+        self._last_cut = 0
+        self._cond = threading.Condition()
+        with _live_lock:
+            _live[self.token] = self
+
+    def __reduce__(self):
+        return _shared, (self.token, {
+            'max_inflight': self.max_inflight,
+            'bytes_per_second': self.bytes_per_second,
+            'min_inflight': self.min_inflight, 'burst': self.burst})
+
+    def _refill(self, now):
+        if self.bytes_per_second:
+            self.tokens = min(self.burst, self.tokens + (now - self._stamp)
+                              * self.bytes_per_second)
+        self._stamp = now
+
+    def acquire(self):
+        """
+        Wait for a free slot, returning the start time to pass to release
+        """
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                self._refill(now)
+                wait = self._paused_until - now
+                if self.tokens < 0:
+                    wait = max(wait, -self.tokens / self.bytes_per_second)
+                if wait > 0:
+                    self._cond.wait(wait)
+                elif self.inflight < int(self.limit):
+                    self.inflight += 1
+                    return now
+                else:
+                    self._cond.wait()
+
+    def release(self, started, status=None, retry_after=None):
+        """
+        Free a slot, adapting the limit to the response's HTTP status
+
+        ``status`` is None if the request failed without a response.
+        """
+        with self._cond:
+            self.inflight -= 1
+            if status in (429, 503):
+                self.throttled += 1
+                # requests already in flight when the limit was cut say
+                # nothing about the new limit
+                if started >= self._last_cut:
+                    self.limit = max(self.min_inflight, self.limit / 2)
+                    self._last_cut = time.monotonic()
+                if retry_after:
+                    self._paused_until = max(self._paused_until,
+                                             time.monotonic() + retry_after)
+            elif status is not None and status < 400:
+                self.limit = min(self.max_inflight,
+                                 self.limit + 1 / self.limit)
+            self._cond.notify_all()
+
+    def consume(self, nbytes):
+        """
+        Spend nbytes from the bucket, sleeping while it is in debt
+        """
+        if not self.bytes_per_second or not nbytes:
+            return
+        with self._cond:
+            self._refill(time.monotonic())
+            self.tokens -= nbytes
+            debt = -self.tokens
+        if debt > 0:
+            time.sleep(debt / self.bytes_per_second)
+
+    @property
+    def stats(self):
+        return {'limit': self.limit, 'inflight': self.inflight,
+                'throttled': self.throttled}
@@ -0,0 +1,24 @@
+import pytest
+
+from splunk_connector.core import SplunkConnect
+from splunk_connector.mock import MockSplunk, make_data
+
+
+@pytest.fixture
+def data():
+    return make_data(1000)
+
+
+@pytest.fixture
+def server(data):
+    with MockSplunk(data) as server:
+        yield server
+
+
+@pytest.fixture
+def conn(server):
+    conn = SplunkConnect(server.url, key='test')
+    # keep retries quick
+    conn.RETRY_WAIT = 0.01
+    conn.POLL_MIN = 0.01
+    return conn
@@ -0,0 +1,71 @@
+import asyncio
+
+import pandas as pd
+import pytest
+
+from splunk_connector.aio import AsyncSplunkConnect
+
+pytest.importorskip('aiohttp')
+
+
+def run(server, fn, **kwargs):
+    async def main():
+        async with AsyncSplunkConnect(server.url, key='test',
+                                      **kwargs) as conn:
+            conn.RETRY_WAIT = 0.01
+            return await fn(conn)
+    return asyncio.run(main())
+
+
+def test_auth(server):
+    async def fn(conn):
+        await conn.auth('admin', 'pw')
+        return conn.head
+    head = run(server, fn)
+    assert head['Authorization'].startswith('Splunk ')
+
+
+def test_read_pandas(server, data):
+    df = run(server, lambda conn: conn.read_pandas('*'))
+    pd.testing.assert_frame_equal(df, data)
+
+
+def test_read_pandas_parallel(server, data):
+    df = run(server, lambda conn: conn.read_pandas('*', parallel=4,
+                                                   chunksize=150))
+    pd.testing.assert_frame_equal(df, data)
+
+
+def test_read_pandas_iter(server, data):
+    async def fn(conn):
+        return [df async for df in conn.read_pandas_iter('*', 400)]
+    parts = run(server, fn)
+    assert [len(p) for p in parts] == [400, 400, 200]
+
+
+def test_concurrent_jobs(server, data):
+    async def fn(conn):
+        return await asyncio.gather(*[conn.read_pandas('*', parallel=2)
+                                      for _ in range(5)])
+    out = run(server, fn)
+    assert len(out) == 5 and all(len(df) == len(data) for df in out)
+    # one session, with connections shared between the jobs
+    assert server.stats['connections'] < server.stats['requests']
+
+
+def test_saved_searches():
+    from splunk_connector.mock import MockSplunk
+    with MockSplunk(nrows=1, saved={'a': 'search a'}) as server:
+        assert run(server, lambda conn: conn.list_saved_searches()) == {
+            'a': 'search a'}
+
+
+def test_poll_stats_capped(server):
+    async def fn(conn):
+        conn.POLL_STATS_MAX = 2
+        sids = [await conn.start_query('*') for _ in range(4)]
+        for sid in sids:
+            await conn.wait_poll(sid)
+        return sids, list(conn.poll_stats)
+    sids, kept = run(server, fn)
+    assert kept == sids[2:]
@@ -0,0 +1,44 @@
+import pandas as pd
+import pytest
+
+pa = pytest.importorskip('pyarrow')
+
+
+def test_get_dataframe_arrow(conn, data):
+    sid = conn.start_query('*')
+    conn.wait_poll(sid)
+    df = conn.get_dataframe(sid, parser='arrow')
+    assert all(isinstance(t, pd.ArrowDtype) for t in df.dtypes)
+    assert df['field0'].tolist() == data['field0'].tolist()
+    assert df['host'].tolist() == data['host'].tolist()
+
+
+def test_as_table(conn, data):
+    sid = conn.start_query('*')
+    conn.wait_poll(sid)
+    table = conn.get_dataframe(sid, parser='arrow', as_table=True)
+    assert isinstance(table, pa.Table)
+    assert table.num_rows == len(data)
+    assert table.column_names == list(data.columns)
+
+
+def test_read_pandas_arrow_parallel(conn, data):
+    df = conn.read_pandas('*', parallel=3, parser='arrow')
+    assert len(df) == len(data)
+    assert df['field2'].dtype == pd.ArrowDtype(pa.int64())
+    assert df['field2'].tolist() == data['field2'].tolist()
+
+
+def test_read_pandas_as_table(conn, data):
+    table = conn.read_pandas('*', parallel=4, parser='arrow', as_table=True)
+    assert isinstance(table, pa.Table)
+    assert table.num_rows == len(data)
+
+
+def test_bad_options(conn):
+    with pytest.raises(ValueError, match='parser must be'):
+        conn.read_pandas('*', parser='polars')
+    with pytest.raises(ValueError, match='as_table requires'):
+        conn.read_pandas('*', as_table=True)
+    with pytest.raises(ValueError, match='arrow tables'):
+        conn.read_dask('*', 100, parser='arrow', as_table=True)
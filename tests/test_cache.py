@@ -0,0 +1,166 @@
+import os
+import time
+
+import pandas as pd
+import pytest
+
+from splunk_connector.cache import ResultCache
+from splunk_connector.core import SplunkConnect
+
+pytest.importorskip('pyarrow')
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return ResultCache(str(tmp_path / 'cache'))
+
+
+def frame(n):
+    return pd.DataFrame({'a': range(n), 'b': ['x'] * n})
+
+
+def test_key():
+    assert ResultCache.key('search *', 1, 2, parser='arrow') == \
+        ResultCache.key('search *', 1, 2, parser='arrow')
+    assert ResultCache.key('search *', 1, 2) != ResultCache.key('search *')
+    assert ResultCache.key('search *', parser='arrow') != \
+        ResultCache.key('search *')
+
+
+def test_put_load(cache):
+    cache.put('k', frame(10))
+    pd.testing.assert_frame_equal(cache.load('k'), frame(10))
+    assert cache.load('missing') is None
+
+
+def test_ttl(cache):
+    cache.ttl = 0.1
+    cache.put('k', frame(10))
+    assert cache.get('k') is not None
+    time.sleep(0.2)
+    assert cache.get('k') is None
+    assert not os.listdir(cache.path)
+
+
+def test_lru(cache):
+    for k in 'abc':
+        cache.put(k, frame(1000))
+        time.sleep(0.01)
+    total = sum(e[2] for e in cache.entries())
+    cache.get('a')  # now the most recently read
+    # room for all but one
+    cache.max_bytes = total - 1
+    cache.evict()
+    assert [e[0] for e in cache.entries()] == ['c', 'a']
+
+
+def test_parts(cache):
+    staging = cache.begin('k', 2)
+    cache.put_part(staging, 1, frame(2))
+    # incomplete entries are invisible, and never evicted
+    assert cache.get('k') is None
+    cache.max_bytes = 0
+    cache.evict()
+    assert os.path.isdir(staging)
+    cache.max_bytes = 2**30
+    cache.put_part(staging, 0, frame(1))
+    assert len(cache.get('k')) == 2
+    assert len(cache.load('k')) == 3
+
+
+def test_concurrent_writers(cache):
+    first = cache.begin('k', 2)
+    second = cache.begin('k', 1)
+    cache.put_part(first, 0, frame(1))
+    cache.put_part(second, 0, frame(5))
+    cache.put_part(first, 1, frame(1))
+    # each writer's entry is whole; the last to finish wins
+    assert len(cache.load('k')) == 2
+    assert os.listdir(cache.path) == ['k']
+
+
+def test_abandoned(cache):
+    staging = cache.begin('k', 2)
+    cache.put_part(staging, 0, frame(1))
+    cache.ttl = 0
+    cache.evict()
+    assert not os.listdir(cache.path)
+    # a late part is dropped, not an error
+    cache.put_part(staging, 1, frame(1))
+    assert cache.get('k') is None
+
+
+def test_read_pandas_cached(server, tmp_path, data):
+    cache = ResultCache(str(tmp_path))
+    conn = SplunkConnect(server.url, key='test', cache=cache)
+    df = conn.read_pandas('*', parallel=2)
+    requests = server.stats['requests']
+    pd.testing.assert_frame_equal(conn.read_pandas('*', parallel=2), df)
+    assert server.stats['requests'] == requests
+    # other parse options are another entry
+    conn.read_pandas('*', parallel=2, usecols=['host'])
+    assert server.stats['requests'] > requests
+
+
+def test_read_dask_cached(server, tmp_path, data):
+    cache = ResultCache(str(tmp_path))
+    conn = SplunkConnect(server.url, key='test', cache=cache)
+    df = conn.read_dask('*', 300).compute()
+    assert len(cache.entries()) == 1
+    requests = server.stats['requests']
+    ddf = conn.read_dask('*', 300)
+    assert ddf.npartitions == 4
+    pd.testing.assert_frame_equal(ddf.compute(), df)
+    assert server.stats['requests'] == requests
+
+
+def test_read_dask_over_max_bytes(server, tmp_path, data):
+    cache = ResultCache(str(tmp_path), max_bytes=10000)
+    conn = SplunkConnect(server.url, key='test', cache=cache)
+    df = conn.read_dask('*', 200).compute()
+    assert len(df) == len(data)
+    # too large to keep, but nothing left behind
+    assert not os.listdir(tmp_path)
+
+
+def test_job_registry():
+    from splunk_connector.cache import JobRegistry
+    jobs = JobRegistry(ttl=0.1)
+    key = jobs.key('search *', 1, 2)
+    jobs.put(key, 'sid1')
+    assert jobs.get(key) == 'sid1'
+    assert jobs.get(jobs.key('search *')) is None
+    time.sleep(0.2)
+    assert jobs.get(key) is None
+
+
+def test_job_registry_pickle():
+    import pickle
+    from splunk_connector.cache import JobRegistry
+    jobs = JobRegistry(ttl=5)
+    jobs.put('k', 'sid')
+    jobs = pickle.loads(pickle.dumps(jobs))
+    assert jobs.ttl == 5 and jobs.get('k') is None
+
+
+def test_jobs_shared(server, data):
+    from splunk_connector.cache import JobRegistry
+    conn = SplunkConnect(server.url, key='test', jobs=JobRegistry())
+    conn.read_pandas('*')
+    conn.read_pandas(' search * ')
+    list(conn.read_pandas_iter('*', 500))
+    assert len(server.jobs) == 1
+    conn.read_pandas('*', earliest='2020-01-01T00:10:00')
+    assert len(server.jobs) == 2
+
+
+def test_read_by_sid(conn, server, data):
+    sid = conn.start_query('*')
+    df = conn.read_pandas(sid=sid, parallel=2)
+    pd.testing.assert_frame_equal(df, data, check_dtype=False)
+    parts = list(conn.read_pandas_stream(None, 400, sid=sid))
+    assert sum(len(p) for p in parts) == len(data)
+    assert len(conn.read_dask(None, 300, sid=sid).compute()) == len(data)
+    assert len(server.jobs) == 1
+    with pytest.raises(ValueError, match='query or a job SID'):
+        conn.read_pandas()
@@ -0,0 +1,67 @@
+import pandas as pd
+import pytest
+
+from splunk_connector.core import SplunkConnect
+from splunk_connector.mock import MockSplunk
+from splunk_connector.throttle import Throttle
+
+
+@pytest.fixture
+def cluster(data):
+    with MockSplunk(data, members=3) as server:
+        yield server
+
+
+def test_spread_over_members(cluster, data):
+    conn = SplunkConnect(cluster.urls, key='test')
+    df = conn.read_pandas('*', parallel=3, chunksize=50)
+    pd.testing.assert_frame_equal(df, data, check_dtype=False)
+    counts = cluster.stats['by_member']
+    assert len(counts) == 3
+    # 20 chunks and the samples, in turn
+    assert min(counts.values()) >= 6
+
+
+def test_jobs_shared(cluster):
+    conn = SplunkConnect(cluster.urls, key='test')
+    sid = conn.start_query('*')
+    for url in cluster.urls:
+        other = SplunkConnect(url, key='test')
+        assert other.poll_query(sid)[0]
+
+
+def test_failover(cluster, data):
+    conn = SplunkConnect(cluster.urls, key='test')
+    conn.RETRY_WAIT = 0.01
+    conn.read_pandas('*', parallel=3)
+    cluster.stop_member(cluster.servers[0])
+    df = conn.read_pandas('*', parallel=3, chunksize=100)
+    pd.testing.assert_frame_equal(df, data, check_dtype=False)
+    assert cluster.urls[0] in conn.down
+
+
+def test_check_health(cluster):
+    conn = SplunkConnect(cluster.urls, key='test')
+    dead = cluster.urls[1]
+    cluster.stop_member(cluster.servers[1])
+    health = conn.check_health()
+    assert health == {u: u != dead for u in cluster.urls}
+    assert list(conn.down) == [dead]
+    assert conn._pick_url() == cluster.urls[0]
+    assert {conn._pick_url(balance=True) for _ in range(4)} == \
+        {cluster.urls[0], cluster.urls[2]}
+
+
+def test_all_down(cluster):
+    conn = SplunkConnect(cluster.urls, key='test')
+    conn.down = dict(zip(cluster.urls, [3e10, 1e10, 2e10]))
+    # the one due back soonest
+    assert conn._pick_url() == cluster.urls[1]
+
+
+def test_throttle_per_member(cluster, data):
+    throttles = {u: Throttle(max_inflight=2) for u in cluster.urls}
+    conn = SplunkConnect(cluster.urls, key='test', throttle=throttles)
+    conn.read_pandas('*', parallel=6, chunksize=50)
+    assert all(t.inflight == 0 for t in throttles.values())
+    assert conn._throttle(cluster.urls[1]) is throttles[cluster.urls[1]]
@@ -0,0 +1,87 @@
+import numpy as np
+import pandas as pd
+
+from splunk_connector.core import _downcast
+
+CATEGORICAL = ['host', 'source', 'sourcetype', 'index', 'splunk_server']
+
+
+def check(df, data):
+    for c in CATEGORICAL:
+        assert isinstance(df[c].dtype, pd.CategoricalDtype), c
+    pd.testing.assert_frame_equal(
+        df.astype({c: data[c].dtype for c in CATEGORICAL}),
+        data.reset_index(drop=True), check_dtype=False)
+
+
+def test_downcast():
+    df = pd.DataFrame({'i': np.arange(1000), 'f': np.arange(1000) / 2,
+                       'g': np.arange(1000) / 3,
+                       'n': pd.array([1, None] * 500, dtype='Int64'),
+                       's': ['x'] * 1000, 'b': [True] * 1000})
+    out = _downcast(df)
+    assert out['i'].dtype == 'int16'
+    assert out['f'].dtype == 'float32'
+    # not exact in 32 bits
+    assert out['g'].dtype == 'float64'
+    assert out['n'].dtype == 'Int8'
+    assert out['s'].dtype == df['s'].dtype and out['b'].dtype == bool
+    pd.testing.assert_frame_equal(out, df, check_dtype=False)
+
+
+def test_read_pandas_compact(conn, data):
+    df = conn.read_pandas('*', compact=True)
+    check(df, data)
+    assert df['field0'].dtype == 'int16'
+    assert df.memory_usage(deep=True).sum() < \
+        data.memory_usage(deep=True).sum() / 3
+
+
+def test_read_pandas_parallel_compact(conn, data):
+    df = conn.read_pandas('*', parallel=4, compact=True)
+    check(df, data)
+    assert sorted(df['host'].cat.categories) == sorted(data['host'].unique())
+
+
+def test_iter_shares_categories(conn, data):
+    parts = list(conn.read_pandas_iter('*', 100, compact=True))
+    assert len({p['host'].dtype for p in parts}) == 1
+    df = pd.concat(parts, ignore_index=True)
+    check(df, data)
+    # in order of first appearance
+    assert df['host'].cat.categories.tolist() == \
+        data['host'].unique().tolist()
+
+
+def test_stream_shares_categories(conn, data):
+    parts = list(conn.read_pandas_stream('*', 100, compact=True))
+    assert len({p['host'].dtype for p in parts}) == 1
+    check(pd.concat(parts, ignore_index=True), data)
+
+
+def test_get_dataframe_iter_shares_categories(conn, data):
+    sid = conn.start_query('*')
+    conn.wait_poll(sid)
+    parts = list(conn.get_dataframe_iter(sid, 100, compact=True))
+    assert len({p['host'].dtype for p in parts}) == 1
+
+
+def test_categories_per_read(conn, data):
+    conn.read_pandas('*', compact=True)
+    df = conn.read_pandas('*', compact=True,
+                          filters=[('host', '=', 'web-01')])
+    assert df['host'].cat.categories.tolist() == ['web-01']
+    parts = list(conn.read_pandas_iter('*', 100, compact=True,
+                                       filters=[('host', '=', 'web-02')]))
+    assert parts[0]['host'].cat.categories.tolist() == ['web-02']
+
+
+def test_read_dask_compact(conn, data):
+    ddf = conn.read_dask('*', 250, compact=True)
+    assert isinstance(ddf['host'].dtype, pd.CategoricalDtype)
+    df = ddf.compute().reset_index(drop=True)
+    check(df, data)
+    conn.read_pandas('*', compact=True)
+    df = conn.read_dask('*', 250, compact=True,
+                        filters=[('host', '=', 'web-03')]).compute()
+    assert df['host'].cat.categories.tolist() == ['web-03']
@@ -0,0 +1,174 @@
+import io
+
+import pandas as pd
+import pytest
+import requests
+
+from splunk_connector.core import SplunkConnect
+
+
+def test_auth(server):
+    conn = SplunkConnect(server.url)
+    conn.auth('admin', 'pw')
+    assert conn.key and conn.head == {'Authorization': 'Splunk ' + conn.key}
+    conn.auth_head(user='admin', pw='pw')
+    assert conn.head['Authorization'].startswith('Basic ')
+    with pytest.raises(ValueError):
+        conn.auth_head()
+
+
+def test_unauthorized(server):
+    with pytest.raises(requests.HTTPError):
+        SplunkConnect(server.url).list_saved_searches()
+
+
+def test_saved_searches():
+    from splunk_connector.mock import MockSplunk
+    with MockSplunk(nrows=1, saved={'errors': 'search error'}) as server:
+        conn = SplunkConnect(server.url, key='test')
+        assert conn.list_saved_searches() == {'errors': 'search error'}
+
+
+def test_sanitize_query():
+    assert SplunkConnect._sanitize_query(' index=main ') == 'search index=main'
+    assert SplunkConnect._sanitize_query('search x') == 'search x'
+    assert SplunkConnect._sanitize_query('| inputlookup x') == \
+        '| inputlookup x'
+
+
+def test_query_lifecycle(conn, data):
+    sid = conn.start_query('*')
+    assert conn.wait_poll(sid) == (True, len(data))
+    assert conn.poll_query(sid) == (True, len(data))
+    df = conn.get_dataframe(sid, offset=5, count=10)
+    assert df['field1'].tolist() == data['field1'][5:15].tolist()
+
+
+def test_read_pandas(conn, data):
+    df = conn.read_pandas('*')
+    pd.testing.assert_frame_equal(df, data)
+
+
+def test_read_pandas_iter(conn, data):
+    parts = list(conn.read_pandas_iter('*', 300))
+    assert [len(p) for p in parts] == [300, 300, 300, 100]
+    pd.testing.assert_frame_equal(pd.concat(parts, ignore_index=True), data)
+
+
+def test_read_dask(conn, data):
+    df = conn.read_dask('*', 300)
+    assert df.npartitions == 4
+    pd.testing.assert_frame_equal(df.compute().reset_index(drop=True), data,
+                                  check_dtype=False)
+
+
+def test_session_reused(server, conn):
+    for _ in range(5):
+        conn.list_saved_searches()
+    assert server.stats['connections'] == 1
+
+
+def test_no_keep_alive(server):
+    conn = SplunkConnect(server.url, key='test', keep_alive=False)
+    for _ in range(3):
+        conn.list_saved_searches()
+    assert server.stats['connections'] == 3
+
+
+def test_pickle(conn):
+    import pickle
+    conn2 = pickle.loads(pickle.dumps(conn))
+    assert conn2.session is not conn.session
+    assert conn2.head == conn.head
+    conn2.list_saved_searches()
+
+
+@pytest.mark.parametrize('parallel,chunksize', [(4, None), (3, 100),
+                                                (8, 999), (2, 5000)])
+def test_read_pandas_parallel(conn, data, parallel, chunksize):
+    df = conn.read_pandas('*', parallel=parallel, chunksize=chunksize)
+    # chunks agree on nullable integer dtypes
+    expected = data.astype({'field%i' % i: 'Int64' for i in range(4)})
+    pd.testing.assert_frame_equal(df, expected)
+
+
+def test_read_pandas_dtypes(conn, data):
+    assert conn.read_pandas('*')['field0'].dtype == 'int64'
+    assert conn.read_pandas('*', parallel=2)['field0'].dtype == 'Int64'
+
+
+def test_read_pandas_parallel_requests(server, conn):
+    conn.read_pandas('*')
+    # dispatch, status, results
+    assert server.stats['requests'] == 3
+    conn.read_pandas('*', parallel=4, chunksize=100)
+    # plus four samples to agree on dtypes, and ten chunks
+    assert server.stats['requests'] == 3 + 2 + 4 + 10
+
+
+def test_read_pandas_parallel_empty(server, conn):
+    df = conn.read_pandas('* | where field0 < 0', parallel=4)
+    assert len(df) == 0
+
+
+def test_read_pandas_stream(server, conn, data):
+    parts = list(conn.read_pandas_stream('*', 300, buffer_size=1024))
+    assert [len(p) for p in parts] == [300, 300, 300, 100]
+    pd.testing.assert_frame_equal(pd.concat(parts, ignore_index=True), data)
+    # one results request in all
+    assert server.stats['requests'] == 3
+
+
+def test_get_query_stream(conn, data):
+    sid = conn.start_query('*')
+    conn.wait_poll(sid)
+    with conn.get_query_stream(sid, offset=10, count=20,
+                               buffer_size=64) as f:
+        first = f.read(1000)
+        assert 0 < len(first) <= 64
+        df = pd.read_csv(io.BytesIO(first + f.read()))
+    assert df['field0'].tolist() == data['field0'][10:30].tolist()
+
+
+def test_get_dataframe_iter_empty(conn):
+    sid = conn.start_query('* | where field0 < 0')
+    conn.wait_poll(sid)
+    assert [len(df) for df in conn.get_dataframe_iter(sid, 100)] in ([], [0])
+
+
+def test_stream_yields_before_body_ends(data):
+    import time
+    from splunk_connector.mock import MockSplunk
+    size = len(data.to_csv(index=False))
+    with MockSplunk(data, bandwidth=size) as server:
+        conn = SplunkConnect(server.url, key='test', compress=False)
+        t0 = time.perf_counter()
+        chunks = conn.read_pandas_stream('*', 100, buffer_size=4096)
+        next(chunks)
+        first = time.perf_counter() - t0
+        assert sum(1 for _ in chunks) == 9
+        total = time.perf_counter() - t0
+    # the body takes a second to send
+    assert total > 0.8 and first < total / 2
+
+
+def test_read_pandas_export(server, conn, data):
+    parts = list(conn.read_pandas_export('*', 300))
+    pd.testing.assert_frame_equal(pd.concat(parts, ignore_index=True), data)
+    assert all(len(p) <= 300 for p in parts)
+    # no job: a single request
+    assert server.stats['requests'] == 1 and not server.jobs
+
+
+def test_export_starts_before_search_ends(data):
+    import time
+    from splunk_connector.mock import MockSplunk
+    with MockSplunk(data, run_time=1) as server:
+        conn = SplunkConnect(server.url, key='test')
+        t0 = time.perf_counter()
+        chunks = conn.read_pandas_export('*', 100, buffer_size=1024)
+        next(chunks)
+        first = time.perf_counter() - t0
+        rows = 100 + sum(len(df) for df in chunks)
+    assert rows == len(data)
+    assert first < 0.5
@@ -0,0 +1,33 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY = ['pandas', 'numpy', 'requests', 'urllib3', 'dask', 'pyarrow',
+         'aiohttp']
+
+
+@pytest.mark.parametrize('module', [
+    'splunk_connector', 'splunk_connector.core', 'splunk_connector.aio',
+    'splunk_connector.cache', 'splunk_connector.metrics',
+    'splunk_connector.throttle', 'splunk_connector.mock'])
+def test_no_heavy_imports(module):
+    code = ('import json, sys; import %s; '
+            'print(json.dumps([m for m in %r if m in sys.modules]))'
+            % (module, HEAVY))
+    out = subprocess.run([sys.executable, '-c', code], check=True, cwd=ROOT,
+                         capture_output=True, text=True).stdout
+    assert json.loads(out) == []
+
+
+def test_connector_without_heavy_imports():
+    code = ('import sys; from splunk_connector.core import SplunkConnect; '
+            'SplunkConnect("http://localhost:1", key="k"); '
+            'print("pandas" in sys.modules)')
+    out = subprocess.run([sys.executable, '-c', code], check=True, cwd=ROOT,
+                         capture_output=True, text=True).stdout
+    # making a connector needs requests, but not pandas
+    assert out.strip() == 'False'
@@ -0,0 +1,163 @@
+import pickle
+
+import pytest
+import requests
+
+from splunk_connector.core import SplunkConnect
+from splunk_connector.metrics import FIELDS, Metrics
+
+
+@pytest.fixture
+def metrics():
+    return Metrics()
+
+
+@pytest.fixture
+def hooked(server, metrics):
+    conn = SplunkConnect(server.url, key='test', hooks=[metrics])
+    conn.RETRY_WAIT = 0.01
+    return conn
+
+
+def test_events(hooked, metrics, data, server):
+    hooked.read_pandas('*', parallel=2)
+    events = metrics.events
+    assert all(list(e) == FIELDS for e in events)
+    requests_ = [e for e in events if e['kind'] == 'request']
+    assert [e['name'] for e in requests_[:2]] == ['dispatch', 'status']
+    assert all(e['url'] == server.url and e['status'] < 300
+               and e['seconds'] > 0 and e['retries'] == 0
+               for e in requests_)
+    parsed = [e for e in events if e['kind'] == 'parse'
+              and e['name'] == 'results']
+    results = [e for e in requests_ if e['name'] == 'results']
+    assert sum(e['rows'] for e in parsed) >= len(data)
+    assert all(e['bytes'] > 0 for e in results)
+    assert any(e['kind'] == 'decompress' for e in events)
+
+
+def test_stream_events(hooked, metrics, data):
+    list(hooked.read_pandas_stream('*', 300))
+    reads = [e for e in metrics.events if e['kind'] == 'read']
+    assert len(reads) == 1 and reads[0]['bytes'] > 0
+    parsed = [e for e in metrics.events if e['kind'] == 'parse']
+    assert [e['rows'] for e in parsed] == [300, 300, 300, 100]
+
+
+def test_retries_and_errors(hooked, metrics, server):
+    server.fail_next(2)
+    hooked.list_saved_searches()
+    server.fail_next(1, status=404)
+    with pytest.raises(requests.HTTPError):
+        hooked.list_saved_searches()
+    first, second = [e for e in metrics.events if e['kind'] == 'request']
+    assert first['retries'] == 2 and first['status'] == 200
+    assert first['error'] is None
+    assert second['status'] == 404
+    assert isinstance(second['error'], requests.HTTPError)
+
+
+def test_summary(hooked, metrics):
+    hooked.read_pandas('*', parallel=4)
+    summary = metrics.summary()
+    assert list(summary.columns) == ['count', 'errors', 'retries', 'p50',
+                                     'p95', 'p99', 'seconds', 'bytes', 'rows',
+                                     'rows/s', 'MB/s']
+    # four samples to infer dtypes, and four chunks
+    assert summary.loc[('request', 'results'), 'count'] == 8
+    assert summary.loc[('parse', 'results'), 'rows'] == 1000
+    assert 'url' in metrics.summary(by=['kind', 'name', 'url']).index.names
+    assert 'dispatch' in metrics.report()
+    assert len(metrics.to_frame()) == len(metrics.events)
+    metrics.clear()
+    assert metrics.events == []
+
+
+def test_pickle(metrics):
+    metrics({'kind': 'request'})
+    assert pickle.loads(pickle.dumps(metrics)).events == metrics.events
+
+
+def test_no_hooks_no_events(conn):
+    # nothing observes calls outside a read call without hooks
+    assert not conn._observed()
+    events = []
+    conn.hooks.append(events.append)
+    conn.list_saved_searches()
+    assert [e['name'] for e in events if e['kind'] == 'request'] == [
+        'saved_searches']
+
+
+def test_custom_hook(server):
+    seen = []
+    conn = SplunkConnect(server.url, key='test',
+                         hooks=[lambda e: seen.append(e['kind'])])
+    list(conn.read_pandas_export('*', 500))
+    assert seen.count('request') == 1 and 'read' in seen
+    assert seen.count('parse') == 2
+
+
+def report_of(df):
+    return df.attrs['splunk']
+
+
+def test_report(conn, data):
+    from splunk_connector.metrics import QueryReport
+    df = conn.read_pandas('*', parallel=2)
+    report = report_of(df)
+    assert isinstance(conn.last_report, QueryReport)
+    assert report == conn.last_report.as_dict()
+    assert set(QueryReport.PHASES) <= set(report)
+    assert report['wall'] > 0 and report['dispatch'] > 0
+    assert report['download'] > 0 and report['parse'] > 0
+    assert report['rows'] >= len(data) and report['bytes'] > 0
+    assert report['resultCount'] == len(data)
+    assert len(report['sids']) == 1
+    # dispatch, status, four samples and two chunks
+    assert report['requests'] == 8
+
+
+def test_report_per_call(conn):
+    conn.read_pandas('*')
+    first = conn.last_report
+    conn.read_pandas('*')
+    assert conn.last_report is not first
+    assert conn.last_report.as_dict()['requests'] == 3
+
+
+def test_report_iter(conn, data):
+    parts = list(conn.read_pandas_iter('*', 250))
+    rows = [report_of(p)['rows'] for p in parts]
+    # each chunk has the figures so far
+    assert rows == [250, 500, 750, 1000]
+    assert conn.last_report.as_dict()['rows'] == len(data)
+
+
+def test_report_partitions(conn):
+    conn.read_pandas('*', earliest='2020-01-01T00:00:00',
+                     latest='2020-01-01T00:20:00', partition='5min')
+    report = conn.last_report.as_dict()
+    assert len(report['sids']) == 4 and report['resultCount'] == 1000
+
+
+def test_report_retries(server, conn):
+    server.fail_next(2)
+    conn.read_pandas('*')
+    assert conn.last_report.as_dict()['retries'] == 2
+
+
+def test_report_queue():
+    from splunk_connector.mock import MockSplunk
+    with MockSplunk(nrows=100, run_time=0.3) as server:
+        conn = SplunkConnect(server.url, key='test')
+        report = conn.read_pandas('*').attrs['splunk']
+    assert report['run'] == pytest.approx(0.3, abs=0.05)
+    assert 0 <= report['queue'] < 0.3
+
+
+def test_report_pickle(conn):
+    conn.read_pandas('*')
+    report = pickle.loads(pickle.dumps(conn.last_report))
+    assert report.as_dict() == conn.last_report.as_dict()
+    assert 'wall=' in repr(report)
+    pickle.loads(pickle.dumps(conn))
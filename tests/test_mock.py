@@ -0,0 +1,124 @@
+import io
+
+import pandas as pd
+import pytest
+import requests
+
+from splunk_connector.mock import MockSplunk, make_data
+
+
+def get(server, path, **kwargs):
+    kwargs.setdefault('headers', {'Authorization': 'Splunk test'})
+    return requests.get(server.url + path, **kwargs)
+
+
+def post(server, path, **kwargs):
+    kwargs.setdefault('headers', {'Authorization': 'Splunk test'})
+    return requests.post(server.url + path, **kwargs)
+
+
+def test_make_data():
+    df = make_data(50, ncols=2)
+    assert len(df) == 50
+    assert list(df.columns) == ['_time', 'host', 'source', 'sourcetype',
+                                'index', 'splunk_server', 'field0', 'field1']
+    assert df.equals(make_data(50, ncols=2))
+
+
+def test_login(server):
+    r = requests.post(server.url + '/services/auth/login',
+                      data={'username': 'admin', 'password': 'pw'})
+    assert r.ok and r.json()['sessionKey']
+    r = requests.post(server.url + '/services/auth/login')
+    assert r.status_code == 400
+
+
+def test_needs_auth(server):
+    r = get(server, '/services/search/jobs/x', headers={})
+    assert r.status_code == 401
+
+
+def test_job_lifecycle(server, data):
+    r = post(server, '/services/search/jobs', data={'search': 'search *'})
+    assert r.status_code == 201
+    sid = r.json()['sid']
+    status = get(server, '/services/search/jobs/%s' % sid).json()
+    content = status['entry'][0]['content']
+    assert content['isDone'] and content['resultCount'] == len(data)
+    r = get(server, '/services/search/jobs/%s/results?output_mode=csv'
+            '&offset=10&count=5' % sid)
+    df = pd.read_csv(io.BytesIO(r.content))
+    assert df['field0'].tolist() == data['field0'][10:15].tolist()
+    r = get(server, '/services/search/jobs/%s/results?output_mode=json'
+            '&offset=0&count=3' % sid)
+    assert [row['host'] for row in r.json()['results']] == \
+        data['host'][:3].tolist()
+
+
+def test_unknown_job(server):
+    r = get(server, '/services/search/jobs/nope/results?output_mode=csv')
+    assert r.status_code == 404
+
+
+def test_run_time():
+    with MockSplunk(nrows=10, run_time=0.5) as server:
+        sid = server.submit('search *')
+        assert not server.status(sid)['isDone']
+        r = get(server, '/services/search/jobs/%s/results?output_mode=csv'
+                % sid)
+        assert r.status_code == 204
+
+
+def test_data_function():
+    with MockSplunk(data=lambda q: make_data(len(q))) as server:
+        sid = server.submit('search abc')
+        assert server.status(sid)['resultCount'] == len('search abc')
+
+
+def test_error_injection(server):
+    server.fail_next(2, status=502)
+    codes = [get(server, '/services/saved/searches').status_code
+             for _ in range(3)]
+    assert codes == [502, 502, 200]
+
+
+def test_error_rate():
+    with MockSplunk(nrows=10, error_rate=1, error_codes=[500]) as server:
+        assert get(server, '/services/saved/searches').status_code == 500
+
+
+def test_latency():
+    with MockSplunk(nrows=10, latency=0.2) as server:
+        r = get(server, '/services/saved/searches')
+        assert r.elapsed.total_seconds() >= 0.2
+
+
+def test_stats(server):
+    with requests.Session() as s:
+        for _ in range(3):
+            s.get(server.url + '/services/saved/searches',
+                  headers={'Authorization': 'Splunk test'})
+    assert server.stats['requests'] == 3
+    assert server.stats['connections'] == 1
+
+
+@pytest.mark.parametrize('earliest,latest,n', [
+    (None, None, 1000),
+    ('2020-01-01T00:01:00', None, 940),
+    ('2020-01-01T00:01:00', '2020-01-01T00:02:00', 60),
+    ('-1h', None, 1000),  # relative times are ignored
+])
+def test_time_range(server, earliest, latest, n):
+    sid = server.submit('search *', earliest, latest)
+    assert server.status(sid)['resultCount'] == n
+
+
+@pytest.mark.parametrize('bandwidth', [None, 1e6])
+def test_bytes_sent(data, bandwidth):
+    with MockSplunk(data, bandwidth=bandwidth, compress=False) as server:
+        sid = server.submit('search *')
+        before = server.stats['bytes_sent']
+        r = get(server, '/services/search/jobs/%s/results?output_mode=csv'
+                '&count=0' % sid)
+        # up to date as soon as the client has the body
+        assert server.stats['bytes_sent'] - before == len(r.content)
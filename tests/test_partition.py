@@ -0,0 +1,105 @@
+import pandas as pd
+import pytest
+
+from splunk_connector.core import _time_slices
+
+START = '2020-01-01T00:00:00'
+END = '2020-01-01T00:16:40'  # the last of the mock's 1000 seconds, plus one
+
+
+def test_time_slices():
+    assert _time_slices(0, 7200, '1h') == [(0, 3600), (3600, 7200)]
+    assert _time_slices(0, 5000, '1h') == [(0, 3600), (3600, 5000)]
+    assert _time_slices('1970-01-01', '1970-01-01T00:30', '1h') == \
+        [(0, 1800)]
+    assert _time_slices(pd.Timestamp(0, unit='s'), 120,
+                        pd.Timedelta('1min')) == [(0, 60), (60, 120)]
+
+
+@pytest.mark.parametrize('earliest,latest,partition,match', [
+    (None, 100, '1h', 'both earliest and latest'),
+    (0, 100, '0s', 'positive'),
+    (100, 100, '1h', 'not after'),
+    (200, 100, '1h', 'not after'),
+])
+def test_time_slices_invalid(earliest, latest, partition, match):
+    with pytest.raises(ValueError, match=match):
+        _time_slices(earliest, latest, partition)
+
+
+def test_read_pandas_partition(server, conn, data):
+    df = conn.read_pandas('*', earliest=START, latest=END, partition='5min')
+    assert len(server.jobs) == 4
+    pd.testing.assert_frame_equal(df, data, check_dtype=False)
+
+
+def test_read_pandas_partition_parallel(conn, data):
+    df = conn.read_pandas('*', earliest=START, latest=END, partition='2min',
+                          parallel=2)
+    pd.testing.assert_frame_equal(df, data, check_dtype=False)
+
+
+def test_read_pandas_partition_empty_slices(server, conn, data):
+    # slices after the data are empty
+    df = conn.read_pandas('*', earliest=START, latest='2020-01-01T01:00',
+                          partition='10min')
+    assert len(server.jobs) == 6
+    pd.testing.assert_frame_equal(df, data, check_dtype=False)
+
+
+def test_read_dask_partition(server, conn, data):
+    df = conn.read_dask('*', 200, earliest=START, latest=END,
+                        partition='5min')
+    # 300, 300, 300 and 100 rows
+    assert df.npartitions == 2 + 2 + 2 + 1
+    pd.testing.assert_frame_equal(df.compute().reset_index(drop=True), data,
+                                  check_dtype=False)
+
+
+def test_partition_errors(conn):
+    with pytest.raises(ValueError, match='existing job'):
+        conn.read_pandas(sid='x', earliest=0, latest=1, partition='1h')
+    with pytest.raises(ValueError, match='not after'):
+        conn.read_pandas('*', earliest=END, latest=START, partition='1h')
+    with pytest.raises(ValueError, match='not after'):
+        conn.read_dask('*', 100, earliest=END, latest=END, partition='1h')
+
+
+def test_read_dask_divisions(server, conn, data):
+    df = conn.read_dask('*', 100, earliest=START, latest=END,
+                        partition='5min', divisions=True)
+    assert df.known_divisions and df.npartitions == 4
+    assert df.divisions[0] == pd.Timestamp(START, tz='UTC')
+    assert df.divisions[-1] == pd.Timestamp(END, tz='UTC')
+    out = df.compute()
+    assert out.index.is_monotonic_increasing and len(out) == len(data)
+    assert out.index.dtype == 'datetime64[ns, UTC]'
+    pd.testing.assert_frame_equal(out.reset_index(drop=True),
+                                  data.drop(columns='_time'),
+                                  check_dtype=False)
+    # selecting by time reads only the slices needed
+    part = df.loc['2020-01-01T00:06:00+00:00':'2020-01-01T00:08:00+00:00']
+    assert part.npartitions == 1
+    assert len(part.compute()) == 121
+
+
+def test_read_dask_divisions_columns(conn):
+    df = conn.read_dask('*', 100, earliest=START, latest=END,
+                        partition='10min', divisions=True,
+                        columns=['host', 'field0'])
+    assert list(df.columns) == ['host', 'field0']
+    assert len(df.compute()) == 1000
+
+
+def test_read_dask_divisions_errors(conn):
+    with pytest.raises(ValueError, match='needs partition'):
+        conn.read_dask('*', 100, earliest=START, latest=END, divisions=True)
+    with pytest.raises(ValueError, match='existing job'):
+        conn.read_dask('*', 100, sid='x', earliest=START, latest=END,
+                       partition='5min', divisions=True)
+    with pytest.raises(ValueError, match='not after'):
+        conn.read_dask('*', 100, earliest=END, latest=START,
+                       partition='5min', divisions=True)
+    with pytest.raises(ValueError, match='needs a _time field'):
+        conn.read_dask('* | fields host', 100, earliest=START, latest=END,
+                       partition='5min', divisions=True)
@@ -0,0 +1,93 @@
+import time
+
+import pytest
+
+from splunk_connector.core import PollScheduler, SplunkConnect
+from splunk_connector.mock import MockSplunk
+
+
+def test_backoff():
+    sched = PollScheduler(minimum=0.1, maximum=1, backoff=2)
+    waits = [sched.next_wait({}) for _ in range(6)]
+    assert waits == [0.1, 0.2, 0.4, 0.8, 1, 1]
+    assert sched.polls == 6
+
+
+def test_aims_at_predicted_finish():
+    sched = PollScheduler(minimum=0.05, maximum=10)
+    # a quarter done after 3 s: 9 s to go
+    assert sched.next_wait({'doneProgress': 0.25, 'runDuration': 3}) == \
+        pytest.approx(9)
+    # bounded by the maximum and minimum
+    assert PollScheduler(maximum=1).next_wait(
+        {'doneProgress': 0.1, 'runDuration': 10}) == 1
+    assert PollScheduler(minimum=0.05).next_wait(
+        {'doneProgress': 0.999, 'runDuration': 1}) == 0.05
+
+
+def test_done():
+    sched = PollScheduler()
+    stats = sched.done({'runDuration': 0})
+    assert stats['polls'] == 1 and stats['wasted'] >= 0
+
+
+@pytest.fixture
+def slow_server():
+    with MockSplunk(nrows=100, run_time=0.5) as server:
+        yield server
+
+
+def test_wait_poll(slow_server):
+    conn = SplunkConnect(slow_server.url, key='test')
+    sid = conn.start_query('*')
+    t0 = time.perf_counter()
+    assert conn.wait_poll(sid) == (True, 100)
+    assert time.perf_counter() - t0 >= 0.4
+    stats = conn.poll_stats[sid]
+    # progress-aware: far fewer polls than a fixed 50 ms interval would take
+    assert 2 <= stats['polls'] <= 8
+    assert stats['wasted'] < 0.3
+
+
+def test_timeout():
+    with MockSplunk(nrows=10, run_time=5) as server:
+        conn = SplunkConnect(server.url, key='test')
+        conn.TIMEOUT = 0.2
+        conn.POLL_TIME = 0.05
+        with pytest.raises(RuntimeError, match='Timeout'):
+            conn.wait_poll(conn.start_query('*'))
+
+
+def test_pipeline(data):
+    import pandas as pd
+    with MockSplunk(data, run_time=1) as server:
+        conn = SplunkConnect(server.url, key='test')
+        t0 = time.perf_counter()
+        chunks = conn.read_pandas_iter('*', 100, pipeline=True)
+        first = next(chunks)
+        t_first = time.perf_counter() - t0
+        parts = [first] + list(chunks)
+    # the first chunk arrives while the job still runs
+    assert t_first < 0.7
+    assert [len(p) for p in parts] == [100] * 10
+    pd.testing.assert_frame_equal(pd.concat(parts, ignore_index=True), data)
+
+
+def test_pipeline_remainder(data):
+    import pandas as pd
+    with MockSplunk(data, run_time=0.3) as server:
+        conn = SplunkConnect(server.url, key='test')
+        parts = list(conn.read_pandas_iter('*', 300, pipeline=True))
+    assert [len(p) for p in parts] == [300, 300, 300, 100]
+    pd.testing.assert_frame_equal(pd.concat(parts, ignore_index=True), data)
+
+
+def test_poll_stats_capped(server):
+    conn = SplunkConnect(server.url, key='test')
+    conn.POLL_STATS_MAX = 3
+    sids = [conn.start_query('*') for _ in range(5)]
+    for sid in sids:
+        conn.wait_poll(sid)
+    assert list(conn.poll_stats) == sids[2:]
+    list(conn.pipeline_iter(sids[0], 500))
+    assert list(conn.poll_stats) == sids[3:] + sids[:1]
@@ -0,0 +1,110 @@
+import pandas as pd
+import pytest
+
+from splunk_connector.core import _fields_clause, _fields_param
+
+COLUMNS = ['host', 'field1']
+
+
+def test_fields_param():
+    assert _fields_param(None) == ''
+    assert _fields_param(['a', 'b c']) == '&f=a&f=b%20c'
+
+
+def test_fields_clause():
+    assert _fields_clause(None) == ''
+    assert _fields_clause(['a', 'b.c', 'd e', 'f"g']) == \
+        ' | fields a, b.c, "d e", "f\\"g"'
+
+
+def test_fewer_bytes(conn):
+    sid = conn.start_query('*')
+    conn.wait_poll(sid)
+    full = conn.get_query_result(sid)
+    part = conn.get_query_result(sid, columns=COLUMNS)
+    # the server sent less, rather than the parser dropping the rest
+    assert len(part) < len(full) / 2
+    assert part.split(b'\n', 1)[0] == b'host,field1'
+
+
+def test_read_pandas_columns(conn, data):
+    df = conn.read_pandas('*', columns=COLUMNS)
+    pd.testing.assert_frame_equal(df, data[COLUMNS])
+
+
+@pytest.mark.parametrize('method', ['read_pandas_iter', 'read_pandas_stream',
+                                    'read_pandas_export'])
+def test_iter_columns(conn, data, method):
+    parts = list(getattr(conn, method)('*', 300, columns=COLUMNS))
+    pd.testing.assert_frame_equal(pd.concat(parts, ignore_index=True),
+                                  data[COLUMNS])
+
+
+def test_read_pandas_parallel_columns(conn, data):
+    df = conn.read_pandas('*', parallel=3, columns=COLUMNS)
+    pd.testing.assert_frame_equal(df, data[COLUMNS], check_dtype=False)
+
+
+def test_read_dask_columns(conn, data):
+    df = conn.read_dask('*', 300, columns=COLUMNS)
+    assert list(df.columns) == COLUMNS
+    assert len(df.compute()) == len(data)
+
+
+@pytest.mark.parametrize('filters,clause', [
+    (None, ''),
+    ([], ''),
+    ([('a', '=', 1)], ' | where a==1'),
+    ([['a', '>', 500]], ' | where a>500'),
+    ([('a', '>=', 1.5), ('b', '!=', 'x')], ' | where a>=1.5 AND b!="x"'),
+    ([[('a', '<', 1)], [('b', '==', True)]],
+     ' | where (a<1) OR (b=="true")'),
+    ([[['a', '<', 1]], [['b', '<=', 2], ['c', '=', None]]],
+     ' | where (a<1) OR (b<=2 AND isnull(c))'),
+    ([('a', 'in', [1, 'x'])], ' | where in(a, 1, "x")'),
+    ([('a', 'not in', (1, 2))], ' | where NOT in(a, 1, 2)'),
+    ([('a', 'in', [])], ' | where false()'),
+    ([('a', '!=', None)], ' | where isnotnull(a)'),
+    ([('b c', '=', 'say "hi"')], ' | where \'b c\'=="say \\"hi\\""'),
+])
+def test_filter_clause(filters, clause):
+    from splunk_connector.core import _filter_clause
+    assert _filter_clause(filters) == clause
+
+
+@pytest.mark.parametrize('filters,match', [
+    ([('a', '~', 1)], 'Unsupported'),
+    ([('a', '<', None)], 'Only = and !='),
+    ([[('a', '=', 1)], []], 'Empty'),
+    ([('host', 'in', 'web-01')], 'list of values'),
+    ([('host', 'not in', b'web-01')], 'list of values'),
+    ([('a', 'in', 5)], 'list of values'),
+])
+def test_filter_clause_invalid(filters, match):
+    from splunk_connector.core import _filter_clause
+    with pytest.raises(ValueError, match=match):
+        _filter_clause(filters)
+
+
+@pytest.mark.parametrize('filters', [
+    [('field0', '>', 500), ('host', 'in', ['web-01', 'web-02'])],
+    [['field0', '>', 500], ['host', 'in', ['web-01', 'web-02']]],
+    [[('field0', '<', 10)], [('field1', '>=', 990)]],
+])
+def test_read_filters(conn, data, filters):
+    expected = data[data.eval(
+        "field0 > 500 and host in ['web-01', 'web-02']"
+        if isinstance(filters[0][0], str) else
+        'field0 < 10 or field1 >= 990')].reset_index(drop=True)
+    assert 0 < len(expected) < len(data)
+    pd.testing.assert_frame_equal(conn.read_pandas('*', filters=filters),
+                                  expected)
+    parts = list(conn.read_pandas_export('*', 100, filters=filters))
+    pd.testing.assert_frame_equal(pd.concat(parts, ignore_index=True),
+                                  expected)
+
+
+def test_filters_need_query(conn):
+    sid = conn.start_query('*')
+    with pytest.raises(ValueError, match='existing job'):
+        conn.read_pandas(sid=sid, filters=[('host', '=', 'web-01')])
@@ -0,0 +1,146 @@
+import asyncio
+import socket
+import time
+
+import pandas as pd
+import pytest
+import requests
+
+from splunk_connector.core import SplunkConnect, _connect_failed, _transient
+from splunk_connector.mock import MockSplunk
+
+DISPATCH = '/services/search/jobs?output_mode=json'
+
+
+def dead_url():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return 'http://127.0.0.1:%i' % s.getsockname()[1]
+
+
+def test_retry_wait(conn):
+    waits = [conn._retry_wait(3) for _ in range(100)]
+    assert all(0 <= w <= conn.RETRY_WAIT * 8 for w in waits)
+    r = requests.Response()
+    r.headers['Retry-After'] = '2'
+    assert conn._retry_wait(0, r) == 2
+    r.headers['Retry-After'] = '3600'
+    assert conn._retry_wait(0, r) == conn.RETRY_MAX_WAIT
+
+
+def test_retry_status(server, conn, data):
+    server.fail_next(2, status=503)
+    pd.testing.assert_frame_equal(conn.read_pandas('*'), data)
+    sid = conn.start_query('*')
+    server.fail_next(3, status=500)
+    assert conn.wait_poll(sid) == (True, len(data))
+
+
+def test_retries_exhausted(server, conn):
+    conn.retries = 1
+    server.fail_next(2, status=502)
+    with pytest.raises(requests.HTTPError):
+        conn.list_saved_searches()
+
+
+def test_no_retry_on_client_error(server, conn):
+    server.fail_next(1, status=400)
+    with pytest.raises(requests.HTTPError):
+        conn.list_saved_searches()
+    assert server.stats['requests'] == 1
+
+
+def test_dispatch_not_retried_after_server_error(server, conn):
+    server.fail_next(1, status=500)
+    with pytest.raises(requests.HTTPError):
+        conn.start_query('*')
+    assert server.stats['requests'] == 1
+    # a refusal is safe to retry
+    server.fail_next(1, status=503)
+    conn.start_query('*')
+    assert len(server.jobs) == 1
+
+
+def test_dispatch_not_retried_after_timeout():
+    with MockSplunk(nrows=10, latency=0.3) as server:
+        conn = SplunkConnect(server.url, key='test')
+        with pytest.raises(requests.ReadTimeout):
+            conn._request('POST', DISPATCH, data={'search': 'search *'},
+                          timeout=0.1)
+        time.sleep(0.4)
+        # the server started the search once, and only once
+        assert len(server.jobs) == 1
+
+
+def test_dispatch_retried_on_connect_failure(server):
+    conn = SplunkConnect([dead_url(), server.url], key='test')
+    conn.start_query('*')
+    assert len(server.jobs) == 1
+
+
+def test_connect_failed():
+    with pytest.raises(_transient()) as info:
+        requests.get(dead_url())
+    assert _connect_failed(info.value)
+    with MockSplunk(nrows=10, latency=0.3) as server:
+        with pytest.raises(_transient()) as info:
+            requests.get(server.url, timeout=0.1)
+    assert not _connect_failed(info.value)
+
+
+def test_cut_download(server, conn, data):
+    sid = conn.start_query('*')
+    conn.wait_poll(sid)
+    server.cut_next(1)
+    df = conn.get_dataframe(sid)
+    pd.testing.assert_frame_equal(df, data)
+
+
+@pytest.mark.parametrize('cuts', [1, 3])
+def test_stream_resumes(server, conn, data, cuts):
+    server.compress = False
+    sid = conn.start_query('*')
+    conn.wait_poll(sid)
+    server.cut_next(cuts, fraction=0.5)
+    parts = list(conn.get_dataframe_iter(sid, 100))
+    pd.testing.assert_frame_equal(pd.concat(parts, ignore_index=True), data)
+    assert all(len(p) <= 100 for p in parts)
+
+
+def test_stream_gives_up(server, conn):
+    conn.retries = 1
+    sid = conn.start_query('*')
+    conn.wait_poll(sid)
+    server.cut_next(5)
+    with pytest.raises(_transient()):
+        list(conn.get_dataframe_iter(sid, 100))
+
+
+def test_read_dask_cut(server, conn, data):
+    ddf = conn.read_dask('*', 250)
+    server.cut_next(2)
+    assert len(ddf.compute()) == len(data)
+
+
+def test_export_cut_raises(server, conn):
+    server.cut_next(1)
+    with pytest.raises(_transient()):
+        list(conn.read_pandas_export('*', 100))
+
+
+def test_aio_retries(server, data):
+    from splunk_connector.aio import AsyncSplunkConnect
+    pytest.importorskip('aiohttp')
+
+    async def main():
+        async with AsyncSplunkConnect(server.url, key='test') as conn:
+            conn.RETRY_WAIT = 0.01
+            server.fail_next(2, status=503)
+            df = await conn.read_pandas('*')
+            server.fail_next(1, status=500)
+            with pytest.raises(Exception, match='500'):
+                await conn.start_query('*')
+            return df
+
+    pd.testing.assert_frame_equal(asyncio.run(main()), data)
+    assert len(server.jobs) == 1
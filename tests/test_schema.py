@@ -0,0 +1,141 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from splunk_connector.core import SplunkConnect
+from splunk_connector.mock import MockSplunk
+
+
+def drifting(n=1000):
+    """
+    Data whose early rows suggest other dtypes than the later ones
+    """
+    return pd.DataFrame({
+        'a': np.r_[np.arange(n - 100), np.arange(100) + 0.5],
+        'b': np.r_[np.arange(n // 2), [None] * (n // 2)],
+        'c': ['x'] * n,
+        'd': np.arange(n),
+    })
+
+
+@pytest.fixture
+def conn_drift():
+    with MockSplunk(drifting()) as server:
+        yield SplunkConnect(server.url, key='test'), server
+
+
+def test_infer_meta(conn_drift):
+    conn, server = conn_drift
+    sid = conn.start_query('*')
+    meta = conn.infer_meta([(sid, conn.wait_poll(sid)[1])])
+    assert len(meta) == 0
+    assert list(meta.columns) == ['a', 'b', 'c', 'd']
+    # sampled from the end as well as the start
+    assert meta['a'].dtype == 'float64' and meta['b'].dtype == 'float64'
+    assert not pd.api.types.is_numeric_dtype(meta['c'])
+    # nullable, in case other rows lack values
+    assert meta['d'].dtype == 'Int64'
+
+
+def test_partitions_agree(conn_drift):
+    conn, server = conn_drift
+    ddf = conn.read_dask('*', 100)
+    parts = [ddf.get_partition(i).compute() for i in range(ddf.npartitions)]
+    assert len({tuple(p.dtypes) for p in parts}) == 1
+    df = conn.read_pandas('*', parallel=4)
+    assert df['a'].dtype == 'float64' and df['d'].dtype == 'Int64'
+    assert df['b'].isna().sum() == 500
+
+
+def test_mismatch(conn_drift):
+    conn, server = conn_drift
+    sid = conn.start_query('*')
+    conn.wait_poll(sid)
+    meta = conn.infer_meta([(sid, 0)])
+    with pytest.raises(ValueError, match='do not match'):
+        conn.get_dataframe(sid, meta=meta.astype({'c': 'Int64'}))
+
+
+def test_jobs_with_other_fields():
+    data = {'a': pd.DataFrame({'_time': [1, 2], 'status': [200, 404]}),
+            'b': pd.DataFrame({'_time': [3, 4], 'host': ['x', 'y'],
+                               'status': [500, 503]}),
+            'c': pd.DataFrame({'status': ['ok', 'ok'], '_time': [5, 6]})}
+    with MockSplunk(lambda q: data[q.split()[-1]]) as server:
+        conn = SplunkConnect(server.url, key='test')
+        jobs = [(conn.start_query(q), 2) for q in 'abc']
+        meta = conn.infer_meta(jobs, nsamples=3, sample_rows=2)
+        assert list(meta.columns) == ['_time', 'status', 'host']
+        assert meta['_time'].dtype == 'Int64'
+        # an int in one job, a string in another
+        assert not pd.api.types.is_numeric_dtype(meta['status'])
+        assert not pd.api.types.is_numeric_dtype(meta['host'])
+
+
+def test_schema_keyed_on_parse_options(conn, server):
+    pytest.importorskip('pyarrow')
+    sid = conn.start_query('*')
+    df = conn.read_pandas(sid=sid, parallel=2, parser='arrow')
+    assert isinstance(df['field0'].dtype, pd.ArrowDtype)
+    df = conn.read_pandas(sid=sid, parallel=2)
+    assert df['field0'].dtype == 'Int64'
+    assert len(conn.schemas) == 2
+
+
+def test_schema_reused(conn, server):
+    conn.read_pandas('*', parallel=2)
+    requests = server.stats['requests']
+    conn.read_pandas('*', parallel=2)
+    # no samples the second time
+    assert server.stats['requests'] - requests == 4
+
+
+def test_schema_expires(conn, server):
+    conn.SCHEMA_TTL = 0
+    conn.read_pandas('*', parallel=2)
+    requests = server.stats['requests']
+    conn.read_pandas('*', parallel=2)
+    assert server.stats['requests'] - requests == 4 + 4
+
+
+def test_schema_max(conn):
+    conn.SCHEMA_MAX = 2
+    for q in ['a', 'b', 'c']:
+        conn.read_pandas(q, parallel=2)
+    assert [k[0] for k in conn.schemas] == ['search b', 'search c']
+
+
+def test_read_dask_empty(conn):
+    df = conn.read_dask('* | where field0 < 0', 100)
+    assert df.npartitions == 1
+    out = df.compute()
+    assert len(out) == 0 and 'field0' in out.columns
+
+
+@pytest.mark.parametrize('dtype', [str, object])
+def test_single_dtype(conn, data, dtype):
+    df = conn.read_pandas('*', parallel=2, dtype=dtype)
+    # every value as read, with no numbers inferred
+    assert not any(pd.api.types.is_numeric_dtype(t) for t in df.dtypes)
+    pd.testing.assert_frame_equal(df.astype(str), data.astype(str))
+    ddf = conn.read_dask('*', 300, dtype=dtype)
+    out = ddf.compute()
+    assert out['field0'].tolist() == data['field0'].astype(str).tolist()
+    assert out.dtypes.equals(ddf.dtypes)
+
+
+def test_dtype_dict(conn, data):
+    df = conn.read_pandas('*', parallel=2, dtype={'field0': 'float64'})
+    assert df['field0'].dtype == 'float64' and df['field1'].dtype == 'Int64'
+
+
+def test_index_col(conn, data):
+    ddf = conn.read_dask('*', 300, index_col='_time')
+    assert ddf.index.name == '_time'
+    assert '_time' not in ddf.columns
+    out = ddf.compute()
+    assert out.index.name == '_time'
+    assert out.index.tolist() == data['_time'].tolist()
+    assert out.index.dtype == ddf.index.dtype
+    df = conn.read_pandas('*', parallel=3, index_col='_time')
+    assert df.index.tolist() == data['_time'].tolist()
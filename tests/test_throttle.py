@@ -0,0 +1,90 @@
+import pickle
+import threading
+import time
+
+import pandas as pd
+
+from splunk_connector.core import SplunkConnect
+from splunk_connector.mock import MockSplunk
+from splunk_connector.throttle import Throttle
+
+
+def test_inflight_limit():
+    t = Throttle(max_inflight=2)
+    t.acquire()
+    t.acquire()
+    got = []
+    th = threading.Thread(target=lambda: got.append(t.acquire()))
+    th.start()
+    th.join(0.1)
+    assert not got
+    t.release(time.monotonic(), 200)
+    th.join(1)
+    assert got and t.inflight == 2
+
+
+def test_aimd():
+    t = Throttle(max_inflight=8, min_inflight=2)
+    started = t.acquire()
+    t.release(started, 503)
+    assert t.limit == 4 and t.throttled == 1
+    # requests started before the cut do not cut again
+    t.release(started, 429)
+    assert t.limit == 4
+    for _ in range(3):
+        t.release(t.acquire(), 429)
+    assert t.limit == 2
+    for _ in range(50):
+        t.release(t.acquire(), 200)
+    assert t.limit == 8
+
+
+def test_retry_after():
+    t = Throttle()
+    t.release(t.acquire(), 503, retry_after=0.2)
+    t0 = time.monotonic()
+    t.acquire()
+    assert time.monotonic() - t0 >= 0.15
+
+
+def test_bytes_per_second():
+    t = Throttle(bytes_per_second=10000)
+    t0 = time.monotonic()
+    for _ in range(3):
+        t.consume(10000)
+    # one second's burst, then two seconds' debt
+    assert 1.8 < time.monotonic() - t0 < 2.5
+
+
+def test_pickle_shares_state():
+    t = Throttle(max_inflight=3)
+    t2 = pickle.loads(pickle.dumps(t))
+    assert t2 is t
+    del t
+    t3 = pickle.loads(pickle.dumps(t2))
+    assert t3 is t2 and t3.max_inflight == 3
+
+
+def test_overloaded_server(data):
+    with MockSplunk(data, capacity=2, latency=0.02) as server:
+        throttle = Throttle(max_inflight=16)
+        conn = SplunkConnect(server.url, key='test', throttle=throttle,
+                             pool_maxsize=16)
+        conn.RETRY_WAIT = 0.01
+        df = conn.read_pandas('*', parallel=16, chunksize=50)
+        pd.testing.assert_frame_equal(df, data, check_dtype=False)
+        assert throttle.throttled > 0
+        assert throttle.limit < 16
+        assert throttle.inflight == 0
+
+
+def test_stream_throttled(data):
+    with MockSplunk(data, compress=False) as server:
+        size = len(data.to_csv(index=False))
+        throttle = Throttle(bytes_per_second=size, burst=size / 10)
+        conn = SplunkConnect(server.url, key='test', throttle=throttle,
+                             compress=False)
+        t0 = time.perf_counter()
+        parts = list(conn.read_pandas_stream('*', 100, buffer_size=4096))
+        assert sum(len(p) for p in parts) == len(data)
+        assert time.perf_counter() - t0 > 0.7
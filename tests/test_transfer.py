@@ -0,0 +1,60 @@
+import gzip
+import zlib
+
+import pandas as pd
+import pytest
+
+from splunk_connector.core import SplunkConnect, _decode
+
+RESULTS = '/services/search/jobs/%s/results/?output_mode=csv&count=0'
+
+
+@pytest.mark.parametrize('encoding,encode', [
+    ('gzip', gzip.compress),
+    ('deflate', zlib.compress),
+    ('deflate', lambda b: zlib.compress(b)[2:-4]),  # without zlib header
+    (None, lambda b: b),
+])
+def test_decode(encoding, encode):
+    body = b'a,b\n1,2\n' * 100
+    assert _decode(encode(body), encoding) == body
+
+
+def job(conn):
+    sid = conn.start_query('*')
+    conn.wait_poll(sid)
+    return sid
+
+
+@pytest.mark.parametrize('compress', [True, False])
+def test_compressed_transfer(server, compress):
+    conn = SplunkConnect(server.url, key='test', compress=compress)
+    r = conn._request('GET', RESULTS % job(conn))
+    if compress:
+        assert r.headers['Content-Encoding'] == 'gzip'
+        assert r.raw.tell() < len(r.content) / 3
+    else:
+        assert 'Content-Encoding' not in r.headers
+        assert r.raw.tell() == len(r.content)
+
+
+@pytest.mark.parametrize('compress', [True, False])
+def test_reads(server, data, compress):
+    conn = SplunkConnect(server.url, key='test', compress=compress)
+    pd.testing.assert_frame_equal(conn.read_pandas('*', parallel=2), data,
+                                  check_dtype=False)
+    for method in ['read_pandas_stream', 'read_pandas_export']:
+        parts = list(getattr(conn, method)('*', 300, buffer_size=512))
+        pd.testing.assert_frame_equal(pd.concat(parts, ignore_index=True),
+                                      data)
+
+
+def test_export_decoded_on_arrival(data):
+    import time
+    from splunk_connector.mock import MockSplunk
+    with MockSplunk(data, run_time=1) as server:
+        conn = SplunkConnect(server.url, key='test')
+        t0 = time.perf_counter()
+        next(conn.read_pandas_export('*', 50))
+        # compressed batches are flushed, not held back until the end
+        assert time.perf_counter() - t0 < 0.5